@@ -1,6 +1,7 @@
 """CLI entry point for MCP Embedded Docs."""
 
 import sys
+from typing import Optional
 
 
 def _run_server():
@@ -19,22 +20,13 @@ def cli():
 
 
 def _cli_group():
-    """Build the Click CLI group with heavy imports deferred."""
-    import logging
+    """Build the Click CLI group with heavy imports deferred.
+
+    Each command imports only what it uses, so `list` never loads the PDF,
+    FAISS or embedding stack.
+    """
     import click
     from pathlib import Path
-    import hashlib
-
-    from .config import Config
-    from .ingestion.pdf_parser import PDFParser
-    from .ingestion.table_detector import TableDetector
-    from .ingestion.table_extractor import TableExtractor
-    from .ingestion.chunker import SemanticChunker
-    from .indexing.embedder import LocalEmbedder
-    from .indexing.vector_store import VectorStore
-    from .indexing.metadata_store import MetadataStore
-
-    logger = logging.getLogger(__name__)
 
     @click.group()
     def _cli():
@@ -42,44 +34,58 @@ def _cli_group():
         pass
 
     @_cli.command()
-    @click.argument('pdf_path', type=click.Path(exists=True))
+    @click.argument('pdf_path', type=click.Path(exists=True, path_type=Path))
     @click.option('--title', help='Document title')
     @click.option('--version', help='Document version')
-    def ingest(pdf_path: str, title: str = None, version: str = None):
+    def ingest(pdf_path: Path, title: Optional[str] = None, version: Optional[str] = None):
         """Index a PDF document."""
-        pdf_path = Path(pdf_path)
+        from .config import Config
+        from .ingestion.pipeline import (
+            document_id, find_indexed_document, index_chunks, parse_document, record_document,
+        )
+        from .ingestion.chunker import SemanticChunker
+        from .indexing.embedder import create_embedder
+        from .indexing.vector_store import VectorStore
+        from .indexing.metadata_store import MetadataStore
+
         config = Config.load()
+        idx_dir = config.index.directory
 
         click.echo(f"Ingesting {pdf_path.name}...", err=True)
 
-        doc_id = hashlib.md5(pdf_path.name.encode()).hexdigest()[:16]
+        doc_id = document_id(pdf_path)
+        metadata_path = idx_dir / config.index.metadata_db
 
-        click.echo("Parsing PDF...", err=True)
-        with PDFParser(pdf_path) as parser:
-            pages = parser.extract_text_with_layout()
-            toc = parser.extract_toc()
-            sections = parser.detect_sections(pages, toc)
+        existing = find_indexed_document(metadata_path, doc_id)
+        if existing:
+            click.echo(f"Already indexed as {existing['filename']} (Document ID: {doc_id})", err=True)
+            return
 
-        click.echo(f"  Extracted {len(pages)} pages, {len(sections)} sections", err=True)
+        click.echo("Parsing PDF and detecting register tables...", err=True)
+        parsed = parse_document(pdf_path, workers=config.ingestion.workers)
+        sections, all_tables, table_pages = parsed.sections, parsed.tables, parsed.table_pages
 
-        click.echo("Detecting register tables...", err=True)
-        extractor = TableExtractor(str(pdf_path))
+        click.echo(f"  Extracted {parsed.page_count} pages, {len(sections)} sections", err=True)
+        click.echo(f"  Found {len(all_tables)} register tables", err=True)
 
-        all_tables = []
-        table_pages = {}
-        with TableDetector(str(pdf_path)) as detector:
-            for page in pages:
-                table_regions = detector.detect_register_tables(page)
-                for region in table_regions:
-                    context = detector.detect_table_context(page, region)
-                    table = extractor.extract_register_table(region, context)
-                    if table:
-                        table_pages[len(all_tables)] = region.page_num
-                        all_tables.append(table)
+        click.echo("Loading embedding model...", err=True)
+        embedder = create_embedder(config)
 
-        click.echo(f"  Found {len(all_tables)} register tables", err=True)
+        # Add to the existing index so earlier documents (and unchanged
+        # chunks of this one) are kept
+        vector_store = VectorStore(
+            dimension=embedder.dimension,
+            index_type=config.index.vector_index,
+            vector_dtype=config.index.vector_dtype,
+            binary_prefilter=config.index.binary_prefilter,
+        )
+        vector_path = idx_dir / config.index.vector_file
+        if vector_path.exists():
+            vector_store.load(vector_path)
+        idx_dir.mkdir(parents=True, exist_ok=True)
+        metadata_store = MetadataStore(metadata_path)
 
-        click.echo("Creating semantic chunks...", err=True)
+        click.echo("Chunking and indexing...", err=True)
         chunker = SemanticChunker(
             target_size=config.chunking.target_size,
             overlap=config.chunking.overlap,
@@ -87,57 +93,29 @@ def _cli_group():
         )
 
         doc_title = title or pdf_path.stem
-        chunks = chunker.chunk_document(
+        chunks = chunker.iter_chunks(
             doc_id, sections, all_tables,
             doc_title=doc_title,
             table_pages=table_pages,
         )
-        click.echo(f"  Created {len(chunks)} chunks", err=True)
 
-        click.echo("Indexing...", err=True)
-        embedder = LocalEmbedder(
-            model_name=config.embeddings.model,
-            device=config.embeddings.device
-        )
+        def show_progress(processed: int, embedded: int):
+            click.echo(f"\r  {processed} chunks processed, {embedded} embedded", nl=False, err=True)
 
-        vector_store = VectorStore(dimension=embedder.dimension)
-        metadata_store = MetadataStore(config.index.directory / config.index.metadata_db)
+        chunk_count = index_chunks(chunks, embedder, vector_store, metadata_store, progress=show_progress)
+        click.echo(err=True)  # End the progress line
+        click.echo(f"  Indexed {chunk_count} chunks", err=True)
 
-        metadata_store.add_document(
-            doc_id=doc_id,
-            filename=pdf_path.name,
-            title=title,
-            version=version
-        )
+        vector_store.save(vector_path)
 
-        chunk_texts = [chunk.text for chunk in chunks]
-        chunk_ids = [chunk.id for chunk in chunks]
-
-        click.echo("  Creating embeddings...", err=True)
-        embeddings = embedder.embed_batch(chunk_texts, show_progress=True)
-
-        vector_store.add_vectors(embeddings, chunk_ids)
-
-        click.echo("  Storing metadata...", err=True)
-        for chunk in chunks:
-            metadata_store.add_chunk(
-                chunk_id=chunk.id,
-                doc_id=chunk.doc_id,
-                chunk_type=chunk.chunk_type,
-                text=chunk.text,
-                page_start=chunk.page_start,
-                page_end=chunk.page_end,
-                structured_data=chunk.structured_data,
-                metadata=chunk.metadata
-            )
-
-        config.index.directory.mkdir(parents=True, exist_ok=True)
-        vector_store.save(config.index.directory / config.index.vector_file)
+        # Replace earlier versions of the file, then save again without their vectors
+        record_document(metadata_store, vector_store, doc_id, pdf_path, title=title, version=version)
+        vector_store.save(vector_path)
         metadata_store.close()
 
         click.echo(f"Successfully indexed {pdf_path.name}", err=True)
         click.echo(f"  Document ID: {doc_id}", err=True)
-        click.echo(f"  Total chunks: {len(chunks)}", err=True)
+        click.echo(f"  Total chunks: {chunk_count}", err=True)
         click.echo(f"  Register tables: {len(all_tables)}", err=True)
 
     @_cli.command()
@@ -148,6 +126,9 @@ def _cli_group():
     @_cli.command(name="list")
     def list_cmd():
         """List indexed documents."""
+        from .config import Config
+        from .indexing.metadata_store import MetadataStore
+
         config = Config.load()
         metadata_store = MetadataStore(config.index.directory / config.index.metadata_db)
 
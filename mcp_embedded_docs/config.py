@@ -11,8 +11,10 @@ from pydantic import BaseModel, Field
 class EmbeddingsConfig(BaseModel):
     """Embeddings configuration."""
     model: str = "BAAI/bge-small-en-v1.5"
+    backend: str = "sentence-transformers"  # or "onnx" (INT8 ONNX Runtime)
     device: str = "cpu"
-    batch_size: int = 32
+    batch_size: int = 64  # Raise to 128-256 on GPU
+    quantization: Optional[str] = None  # "int8": dynamic int8 Linear layers (sentence-transformers on CPU)
 
 
 class LLMFallbackConfig(BaseModel):
@@ -31,6 +33,11 @@ class ChunkingConfig(BaseModel):
     preserve_tables: bool = True
 
 
+class IngestionConfig(BaseModel):
+    """Ingestion pipeline configuration."""
+    workers: Optional[int] = None  # Worker processes for page-level work (None = all CPUs)
+
+
 class SearchConfig(BaseModel):
     """Search configuration."""
     keyword_weight: float = 0.4
@@ -42,6 +49,9 @@ class IndexConfig(BaseModel):
     """Index storage configuration."""
     directory: Path = Path("./index")
     vector_file: str = "vectors.faiss"
+    vector_index: str = "hnsw"  # "flat" (exact search) or "pq" (PQ fast-scan once large, exact re-rank)
+    vector_dtype: str = "float32"  # "float16"/"bf16" (half storage) or "int8" (8-bit scan + float32 re-rank)
+    binary_prefilter: bool = False  # Hamming scan over sign bits, then re-rank
     metadata_db: str = "metadata.db"
     documents_file: str = "documents.json"
 
@@ -52,6 +62,7 @@ class Config(BaseModel):
     embeddings: EmbeddingsConfig = Field(default_factory=EmbeddingsConfig)
     llm_fallback: LLMFallbackConfig = Field(default_factory=LLMFallbackConfig)
     chunking: ChunkingConfig = Field(default_factory=ChunkingConfig)
+    ingestion: IngestionConfig = Field(default_factory=IngestionConfig)
     search: SearchConfig = Field(default_factory=SearchConfig)
     index: IndexConfig = Field(default_factory=IndexConfig)
 
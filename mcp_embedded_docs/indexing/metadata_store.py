@@ -1,15 +1,42 @@
 """SQLite metadata store with full-text search."""
 
+import re
 import sqlite3
-import json
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple, TYPE_CHECKING
 from datetime import datetime
 
+import orjson
+
+if TYPE_CHECKING:
+    import numpy as np
+    from ..ingestion.chunker import Chunk
+
+# Chunk attributes in MetadataStore._chunk_row argument order
+_chunk_fields = attrgetter(
+    "id", "doc_id", "chunk_type", "text", "page_start", "page_end",
+    "structured_data", "metadata", "structured_json",
+)
+
+# Alphanumeric runs of a query word, as FTS5's unicode61 tokenizer splits them
+_TOKEN_RE = re.compile(r"\w+")
+
 
 class MetadataStore:
     """SQLite database for chunk metadata and keyword search."""
 
+    _INSERT_CHUNK_SQL = """
+        INSERT OR REPLACE INTO chunks
+        (id, doc_id, chunk_type, section_hierarchy, page_start, page_end, text, structured_data, metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    _INSERT_REGISTER_SQL = """
+        INSERT INTO registers (name, peripheral, address, offset, chunk_id)
+        VALUES (?, ?, ?, ?, ?)
+    """
+
     def __init__(self, db_path: Path):
         """Initialize metadata store.
 
@@ -20,8 +47,19 @@ class MetadataStore:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn = sqlite3.connect(str(db_path))
         self.conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        self._configure_connection()
         self._create_schema()
 
+    def _configure_connection(self):
+        """Tune SQLite for bulk ingestion and concurrent readers."""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        # Read pages through a 256 MiB memory map and keep up to 64 MiB cached
+        self.conn.execute("PRAGMA mmap_size=268435456")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+
     def _create_schema(self):
         """Create database schema."""
         cursor = self.conn.cursor()
@@ -33,10 +71,16 @@ class MetadataStore:
                 filename TEXT NOT NULL,
                 title TEXT,
                 version TEXT,
-                index_date TEXT NOT NULL
+                index_date TEXT NOT NULL,
+                source_path TEXT
             )
         """)
 
+        # Older databases did not record where a document was ingested from
+        cursor.execute("PRAGMA table_info(documents)")
+        if "source_path" not in {row["name"] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE documents ADD COLUMN source_path TEXT")
+
         # Chunks table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS chunks (
@@ -75,6 +119,16 @@ class MetadataStore:
             )
         """)
 
+        # Older databases removed rows from the external-content FTS table
+        # with a plain DELETE, which reads the already-deleted chunk and
+        # corrupts the index: replace those triggers and rebuild it
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'chunks_ad'")
+        row = cursor.fetchone()
+        rebuild_fts = row is not None and "'delete'" not in row["sql"]
+        if rebuild_fts:
+            cursor.execute("DROP TRIGGER chunks_ad")
+            cursor.execute("DROP TRIGGER IF EXISTS chunks_au")
+
         # Create triggers to keep FTS in sync
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
@@ -84,17 +138,31 @@ class MetadataStore:
 
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
-                DELETE FROM chunks_fts WHERE rowid = old.rowid;
+                INSERT INTO chunks_fts(chunks_fts, rowid, id, text) VALUES ('delete', old.rowid, old.id, old.text);
             END
         """)
 
         cursor.execute("""
             CREATE TRIGGER IF NOT EXISTS chunks_au AFTER UPDATE ON chunks BEGIN
-                UPDATE chunks_fts SET text = new.text WHERE rowid = old.rowid;
+                INSERT INTO chunks_fts(chunks_fts, rowid, id, text) VALUES ('delete', old.rowid, old.id, old.text);
+                INSERT INTO chunks_fts(rowid, id, text) VALUES (new.rowid, new.id, new.text);
             END
         """)
 
+        if rebuild_fts:
+            cursor.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+
         # Create indexes
+        # Embeddings by content hash (model + text), kept across re-ingests
+        # and document removal so unchanged text is never embedded twice
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                key BLOB PRIMARY KEY,
+                vector BLOB NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_documents_index_date ON documents(index_date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc_id ON chunks(doc_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_type ON chunks(chunk_type)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_registers_name ON registers(name)")
@@ -102,7 +170,8 @@ class MetadataStore:
 
         self.conn.commit()
 
-    def add_document(self, doc_id: str, filename: str, title: Optional[str] = None, version: Optional[str] = None):
+    def add_document(self, doc_id: str, filename: str, title: Optional[str] = None, version: Optional[str] = None,
+                     source_path: Optional[str] = None):
         """Add a document to the database.
 
         Args:
@@ -110,18 +179,20 @@ class MetadataStore:
             filename: Document filename
             title: Document title
             version: Document version
+            source_path: Resolved path the document was ingested from
         """
         cursor = self.conn.cursor()
         cursor.execute("""
-            INSERT OR REPLACE INTO documents (id, filename, title, version, index_date)
-            VALUES (?, ?, ?, ?, ?)
-        """, (doc_id, filename, title, version, datetime.now().isoformat()))
+            INSERT OR REPLACE INTO documents (id, filename, title, version, index_date, source_path)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (doc_id, filename, title, version, datetime.now().isoformat(), source_path))
         self.conn.commit()
 
     def add_chunk(self, chunk_id: str, doc_id: str, chunk_type: str, text: str,
                   page_start: int, page_end: int,
                   structured_data: Optional[Dict[str, Any]] = None,
-                  metadata: Optional[Dict[str, Any]] = None):
+                  metadata: Optional[Dict[str, Any]] = None,
+                  structured_json: Optional[str] = None):
         """Add a chunk to the database.
 
         Args:
@@ -133,34 +204,124 @@ class MetadataStore:
             page_end: Ending page number
             structured_data: Optional structured data (will be JSON serialized)
             metadata: Optional metadata dict
+            structured_json: Optional pre-serialized structured_data (skips serialization)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(self._INSERT_CHUNK_SQL, self._chunk_row(
+            chunk_id, doc_id, chunk_type, text, page_start, page_end, structured_data, metadata,
+            structured_json
+        ))
+        cursor.executemany(self._INSERT_REGISTER_SQL, self._register_rows(chunk_id, structured_data))
+        self.conn.commit()
+
+    def add_chunks(self, chunks: Iterable["Chunk"]):
+        """Add many chunks in a single transaction.
+
+        Args:
+            chunks: Chunks to store
         """
+        chunks = list(chunks)
+        chunk_row = self._chunk_row
+        rows = [chunk_row(*_chunk_fields(c)) for c in chunks]
+        register_rows = [
+            row for c in chunks if c.structured_data
+            for row in self._register_rows(c.id, c.structured_data)
+        ]
+
         cursor = self.conn.cursor()
+        # Take the write lock up front so a concurrent writer makes us wait
+        # (busy_timeout) at BEGIN rather than fail partway through the batch
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.executemany(self._INSERT_CHUNK_SQL, rows)
+            cursor.executemany(self._INSERT_REGISTER_SQL, register_rows)
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    def existing_chunk_ids(self, chunk_ids: List[str]) -> Set[str]:
+        """Return the subset of chunk IDs that are already stored.
+
+        Args:
+            chunk_ids: Chunk IDs to look up (at most a few hundred per call)
+
+        Returns:
+            Set of IDs present in the chunks table
+        """
+        if not chunk_ids:
+            return set()
+
+        placeholders = ", ".join("?" * len(chunk_ids))
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT id FROM chunks WHERE id IN ({placeholders})", chunk_ids)
+        return {row["id"] for row in cursor.fetchall()}
+
+    def get_cached_embeddings(self, keys: List[bytes]) -> Dict[bytes, "np.ndarray"]:
+        """Look up cached embeddings.
+
+        Args:
+            keys: Content hashes (at most a few hundred per call)
+
+        Returns:
+            Mapping of key -> float32 vector for the keys that are cached
+        """
+        if not keys:
+            return {}
+
+        # Imported here so listing documents never loads numpy
+        import numpy as np
 
+        placeholders = ", ".join("?" * len(keys))
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", keys)
+        return {row["key"]: np.frombuffer(row["vector"], dtype=np.float32) for row in cursor.fetchall()}
+
+    def cache_embeddings(self, keys: List[bytes], vectors: "np.ndarray"):
+        """Store embeddings under their content hashes.
+
+        Args:
+            keys: Content hashes
+            vectors: Array of shape (len(keys), dimension)
+        """
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO embedding_cache (key, vector) VALUES (?, ?)",
+            zip(keys, (vector.tobytes() for vector in vectors)),
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def _chunk_row(chunk_id: str, doc_id: str, chunk_type: str, text: str,
+                   page_start: int, page_end: int,
+                   structured_data: Optional[Dict[str, Any]],
+                   metadata: Optional[Dict[str, Any]],
+                   structured_json: Optional[str] = None) -> Tuple:
+        """Build the `chunks` row for a chunk, serializing JSON columns."""
         section_hierarchy = None
         if metadata and "section_title" in metadata:
             section_hierarchy = metadata["section_title"]
 
-        structured_json = json.dumps(structured_data) if structured_data else None
-        metadata_json = json.dumps(metadata) if metadata else None
+        if structured_json is None and structured_data:
+            structured_json = orjson.dumps(structured_data).decode()
+        metadata_json = orjson.dumps(metadata).decode() if metadata else None
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO chunks
-            (id, doc_id, chunk_type, section_hierarchy, page_start, page_end, text, structured_data, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (chunk_id, doc_id, chunk_type, section_hierarchy, page_start, page_end,
-              text, structured_json, metadata_json))
-
-        # Extract and add registers if this is a register table
-        if structured_data and "registers" in structured_data:
-            peripheral = structured_data.get("peripheral", "Unknown")
-            for register in structured_data["registers"]:
-                cursor.execute("""
-                    INSERT INTO registers (name, peripheral, address, offset, chunk_id)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (register["name"], peripheral, register.get("address"),
-                      register.get("offset"), chunk_id))
+        return (chunk_id, doc_id, chunk_type, section_hierarchy, page_start, page_end,
+                text, structured_json, metadata_json)
 
-        self.conn.commit()
+    @staticmethod
+    def _register_rows(chunk_id: str, structured_data: Optional[Dict[str, Any]]) -> List[Tuple]:
+        """Build `registers` rows for a register table chunk."""
+        if not structured_data or "registers" not in structured_data:
+            return []
+
+        peripheral = structured_data.get("peripheral", "Unknown")
+        return [
+            (register["name"], peripheral, register.get("address"), register.get("offset"), chunk_id)
+            for register in structured_data["registers"]
+        ]
 
     def keyword_search(self, query: str, top_k: int = 10, doc_filter: Optional[str] = None) -> List[Tuple[str, float]]:
         """Search using keyword matching (FTS5).
@@ -173,6 +334,10 @@ class MetadataStore:
         Returns:
             List of (chunk_id, score) tuples
         """
+        query = self._fts_query(query)
+        if not query:
+            return []
+
         cursor = self.conn.cursor()
 
         if doc_filter:
@@ -201,6 +366,22 @@ class MetadataStore:
 
         return results
 
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """Turn free text into an FTS5 query that matches all of its words.
+
+        Each whitespace-separated word becomes a quoted phrase of its tokens,
+        so punctuation ("FTM_SC?", "CAN0-MCR") and FTS5 operators (AND, NOT,
+        ...) in user queries are matched as text instead of raising syntax
+        errors.
+        """
+        phrases = []
+        for word in query.split():
+            tokens = _TOKEN_RE.findall(word)
+            if tokens:
+                phrases.append('"' + " ".join(tokens) + '"')
+        return " ".join(phrases)
+
     def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
         """Get chunk by ID.
 
@@ -225,8 +406,8 @@ class MetadataStore:
             "page_start": row["page_start"],
             "page_end": row["page_end"],
             "text": row["text"],
-            "structured_data": json.loads(row["structured_data"]) if row["structured_data"] else None,
-            "metadata": json.loads(row["metadata"]) if row["metadata"] else None
+            "structured_data": orjson.loads(row["structured_data"]) if row["structured_data"] else None,
+            "metadata": orjson.loads(row["metadata"]) if row["metadata"] else None
         }
 
     def find_register(self, name: str, peripheral: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -269,17 +450,33 @@ class MetadataStore:
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM documents ORDER BY index_date DESC")
 
-        docs = []
-        for row in cursor.fetchall():
-            docs.append({
-                "id": row["id"],
-                "filename": row["filename"],
-                "title": row["title"],
-                "version": row["version"],
-                "index_date": row["index_date"]
-            })
+        return [self._document_dict(row) for row in cursor.fetchall()]
+
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get document info by ID.
 
-        return docs
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            Document info dictionary or None
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM documents WHERE id = ?", (doc_id,))
+        row = cursor.fetchone()
+
+        return self._document_dict(row) if row else None
+
+    @staticmethod
+    def _document_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a `documents` row to a document info dictionary."""
+        return {
+            "id": row["id"],
+            "filename": row["filename"],
+            "title": row["title"],
+            "version": row["version"],
+            "index_date": row["index_date"]
+        }
 
     def get_document_stats(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """Get statistics for a document.
@@ -336,6 +533,33 @@ class MetadataStore:
         self.conn.commit()
         return True
 
+    def delete_other_versions(self, doc_id: str, source_path: str, legacy_id: Optional[str] = None) -> List[str]:
+        """Delete documents ingested from the same path under a different ID.
+
+        Args:
+            doc_id: Document identifier to keep
+            source_path: Resolved path the document was ingested from
+            legacy_id: ID the document had in an older database that recorded
+                no path; deleted too if its row has no source_path
+
+        Returns:
+            IDs of the deleted documents' chunks
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT id FROM documents
+            WHERE id != ? AND (source_path = ? OR (source_path IS NULL AND id = ?))
+        """, (doc_id, source_path, legacy_id))
+        old_ids = [row["id"] for row in cursor.fetchall()]
+
+        chunk_ids: List[str] = []
+        for old_id in old_ids:
+            cursor.execute("SELECT id FROM chunks WHERE doc_id = ?", (old_id,))
+            chunk_ids.extend(row["id"] for row in cursor.fetchall())
+            self.delete_document(old_id)
+
+        return chunk_ids
+
     def close(self):
         """Close database connection."""
         if self.conn:
@@ -0,0 +1,165 @@
+"""Text embedding using ONNX Runtime with dynamic INT8 quantization."""
+
+import json
+import threading
+from pathlib import Path
+from typing import List
+import numpy as np
+
+
+class OnnxEmbedder:
+    """ONNX Runtime embedder with the same interface as LocalEmbedder.
+
+    The Hugging Face model is exported to ONNX and quantized to INT8 on first
+    use; later runs load the cached model from `cache_dir`. On CPU the
+    quantized model lets ONNX Runtime use VNNI int8 dot-product kernels.
+    On CUDA the FP32 export is used, since the int8 ops fall back to CPU there.
+    """
+
+    QUANTIZED_FILE = "model_quantized.onnx"
+    EXPORTED_FILE = "model.onnx"
+
+    def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5", device: str = "cpu",
+                 batch_size: int = 64, cache_dir: Path = Path("./index/onnx")):
+        """Initialize embedder.
+
+        Args:
+            model_name: Name of the Hugging Face model
+            device: Device to run on ("cpu" or "cuda")
+            batch_size: Number of texts encoded per session run
+            cache_dir: Directory holding exported/quantized models
+        """
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX embeddings backend requires optional dependencies: "
+                "pip install 'mcp-embedded-docs[onnx]'"
+            ) from e
+
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        # Serializes embed_batch: the tokenizer raises "Already borrowed" when
+        # the ingest thread and a search use the shared instance at once
+        self._lock = threading.Lock()
+
+        model_dir = cache_dir / model_name.replace("/", "--")
+        use_cuda = device.startswith("cuda")
+        model_file = self.EXPORTED_FILE if use_cuda else self.QUANTIZED_FILE
+        self.embedding_id = f"onnx:{model_name}:{'fp32' if use_cuda else 'int8'}"
+        if not (model_dir / model_file).exists():
+            self._export(model_name, model_dir)
+
+        providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if use_cuda else ["CPUExecutionProvider"]
+        self.session = ort.InferenceSession(str(model_dir / model_file), providers=providers)
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.pooling = self._pooling_mode(model_name)
+        self.max_length = min(self.tokenizer.model_max_length, 512)
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    @classmethod
+    def _export(cls, model_name: str, model_dir: Path):
+        """Export the model to ONNX and write a dynamically quantized copy."""
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError(
+                "Exporting ONNX models requires optional dependencies: "
+                "pip install 'mcp-embedded-docs[onnx]'"
+            ) from e
+
+        model_dir.mkdir(parents=True, exist_ok=True)
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(model_dir, file_name=cls.EXPORTED_FILE)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=model_dir, quantization_config=qconfig)
+
+    @staticmethod
+    def _pooling_mode(model_name: str) -> str:
+        """Read the pooling mode from the sentence-transformers config ("cls" or "mean")."""
+        config_path = Path(model_name) / "1_Pooling" / "config.json"
+        if not config_path.exists():
+            try:
+                from huggingface_hub import hf_hub_download
+                config_path = Path(hf_hub_download(model_name, "1_Pooling/config.json"))
+            except Exception:
+                return "mean"
+
+        with open(config_path, "r") as f:
+            pooling_config = json.load(f)
+
+        return "cls" if pooling_config.get("pooling_mode_cls_token") else "mean"
+
+    def embed_batch(self, texts: List[str], show_progress: bool = False) -> np.ndarray:
+        """Embed a batch of texts.
+
+        Args:
+            texts: List of texts to embed
+            show_progress: Unused, kept for interface compatibility
+
+        Returns:
+            Array of embeddings with shape (len(texts), dimension)
+        """
+        with self._lock:
+            return self._embed_locked(texts)
+
+    def _embed_locked(self, texts: List[str]) -> np.ndarray:
+        """Embed texts; the caller holds `self._lock`."""
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        # Batch texts of similar length together to minimize padding
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+
+        for start in range(0, len(texts), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in batch_idx],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feed = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+
+            if self.pooling == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = encoded["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+            # Normalize for cosine similarity
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            embeddings[batch_idx] = pooled / np.maximum(norms, 1e-12)
+
+        return embeddings
+
+    def embed_single(self, text: str) -> np.ndarray:
+        """Embed a single text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+        """
+        return self.embed_batch([text])[0]
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a query (same as text embedding for this model).
+
+        Args:
+            query: Query text
+
+        Returns:
+            Embedding vector
+        """
+        return self.embed_single(query)
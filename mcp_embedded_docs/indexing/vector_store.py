@@ -1,25 +1,175 @@
 """FAISS vector store for similarity search."""
 
+import hashlib
+import logging
+import os
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 import numpy as np
 import faiss
 import pickle
 
+logger = logging.getLogger(__name__)
+
+
+# HNSW graph parameters: neighbours per node, build-time and query-time beam width
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# With int8 codes, this many times top_k candidates are re-scored against the
+# exact float32 vectors
+REFINE_K_FACTOR = 4
+
+# "pq" indexes stay exact until they hold this many vectors, then switch to
+# 4-bit product quantization codes (one per PQ_SUBVECTOR_DIMS dimensions)
+# scanned with faiss's SIMD fast-scan kernels. The PQ_REFINE_K_FACTOR * top_k
+# best candidates are re-scored against the exact vectors.
+PQ_MIN_VECTORS = 50_000
+PQ_SUBVECTOR_DIMS = 2
+PQ_REFINE_K_FACTOR = 8
+
+# With the binary prefilter, this many times top_k Hamming-nearest candidates
+# are re-ranked with the stored vectors
+BINARY_RERANK_FACTOR = 32
+
+# Scalar quantizer used for each reduced-precision vector dtype. int8 uses one
+# fixed [-1, 1] range (embeddings are L2-normalized, so nothing clips);
+# float16/bf16 halve storage and need no training. QT_bf16 needs faiss >= 1.10.
+_SQ_TYPES = {
+    "int8": "QT_8bit_uniform",
+    "float16": "QT_fp16",
+    "bf16": "QT_bf16",
+}
+
+
+def chunk_id_to_int64(chunk_id: str) -> int:
+    """Hash a chunk ID to a non-negative int64 FAISS label."""
+    digest = hashlib.blake2b(chunk_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & 0x7FFFFFFFFFFFFFFF
+
 
 class VectorStore:
     """FAISS-based vector storage for semantic search."""
 
-    def __init__(self, dimension: int = 384):
+    def __init__(self, dimension: int = 384, index_type: str = "hnsw", vector_dtype: str = "float32",
+                 binary_prefilter: bool = False):
         """Initialize vector store.
 
         Args:
             dimension: Dimension of embedding vectors
+            index_type: "hnsw" (approximate, O(log N) search), "flat" (exact),
+                or "pq" (exact until PQ_MIN_VECTORS, then a product quantization
+                scan re-ranked with the stored vectors)
+            vector_dtype: "float32"; "float16" or "bf16" to store half-precision
+                vectors; or "int8" to scan 8-bit codes and re-rank the best
+                candidates with the float32 vectors
+            binary_prefilter: Also keep 1-bit sign codes of every vector and
+                answer searches by a Hamming scan over them, re-ranking the
+                top candidates with the stored vectors
         """
         self.dimension = dimension
+        self.index_type = index_type
+        self.vector_dtype = vector_dtype
+        self.binary_prefilter = binary_prefilter
+        self.index = self._build_index(dimension, index_type, vector_dtype)
+        self.binary_index = self._build_binary_index(dimension) if binary_prefilter else None
+        self.ids: Dict[int, str] = {}  # Map from FAISS label to chunk ID
+        self._saved_path: Optional[Path] = None  # File the in-memory state matches
+
+    @staticmethod
+    def _build_index(dimension: int, index_type: str, vector_dtype: str = "float32") -> faiss.Index:
+        """Create an empty index that accepts explicit int64 labels."""
+        sq_type = None
+        if vector_dtype != "float32":
+            if vector_dtype not in _SQ_TYPES:
+                raise ValueError(f"Unknown vector dtype: {vector_dtype}")
+            sq_type = getattr(faiss.ScalarQuantizer, _SQ_TYPES[vector_dtype], None)
+            if sq_type is None:
+                raise ValueError(f"Vector dtype {vector_dtype} is not supported by faiss {faiss.__version__}")
+
         # Use L2 distance (with normalized embeddings, equivalent to cosine similarity)
-        self.index = faiss.IndexFlatL2(dimension)
-        self.ids: List[str] = []  # Map from FAISS index position to chunk ID
+        base: faiss.Index
+        if index_type == "hnsw":
+            if sq_type is not None:
+                base = faiss.IndexHNSWSQ(dimension, sq_type, HNSW_M)
+            else:
+                base = faiss.IndexHNSWFlat(dimension, HNSW_M)
+            base.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            base.hnsw.efSearch = HNSW_EF_SEARCH
+        elif index_type in ("flat", "pq"):
+            # "pq" starts as a flat index; save() converts it once it is large
+            if sq_type is not None:
+                base = faiss.IndexScalarQuantizer(dimension, sq_type)
+            else:
+                base = faiss.IndexFlatL2(dimension)
+        else:
+            raise ValueError(f"Unknown vector index type: {index_type}")
+
+        if vector_dtype == "int8":
+            base.train(_unit_range(dimension))
+            refine = faiss.IndexRefineFlat(base)
+            refine.k_factor = REFINE_K_FACTOR
+            base = refine
+
+        return faiss.IndexIDMap2(base)
+
+    @staticmethod
+    def _build_pq_index(vectors: np.ndarray, vector_dtype: str = "float32") -> faiss.Index:
+        """Create a PQ fast-scan index trained on `vectors`, re-ranked at `vector_dtype`.
+
+        The returned index is trained but empty.
+        """
+        dimension = vectors.shape[1]
+        # Largest number of sub-quantizers that divides the dimension
+        m = next(m for m in range(max(dimension // PQ_SUBVECTOR_DIMS, 1), 0, -1) if dimension % m == 0)
+        pq = faiss.IndexPQFastScan(dimension, m, 4)
+
+        refine: faiss.Index
+        if vector_dtype == "float32":
+            refine = faiss.IndexFlatL2(dimension)
+        else:
+            refine = faiss.IndexScalarQuantizer(dimension, getattr(faiss.ScalarQuantizer, _SQ_TYPES[vector_dtype]))
+            if vector_dtype == "int8":
+                refine.train(_unit_range(dimension))
+
+        index = faiss.IndexRefine(pq, refine)
+        index.k_factor = PQ_REFINE_K_FACTOR
+        index.train(vectors)
+        return faiss.IndexIDMap2(index)
+
+    def _convert_to_pq(self):
+        """Move a "pq" index that has grown past PQ_MIN_VECTORS onto PQ codes."""
+        if self.index_type != "pq" or self.index.ntotal < PQ_MIN_VECTORS:
+            return
+        base = faiss.downcast_index(self.index.index)
+        if isinstance(base, faiss.IndexRefine) and isinstance(faiss.downcast_index(base.base_index), faiss.IndexPQFastScan):
+            return
+
+        labels = faiss.vector_to_array(self.index.id_map)
+        vectors = self.index.reconstruct_batch(labels)
+        index = self._build_pq_index(vectors, self.vector_dtype)
+        index.add_with_ids(vectors, labels)
+        self.index = index
+
+    @staticmethod
+    def _build_binary_index(dimension: int) -> faiss.IndexBinary:
+        """Create an empty Hamming-distance index over sign bits."""
+        return faiss.IndexBinaryIDMap2(faiss.IndexBinaryFlat(dimension))
+
+    @staticmethod
+    def binarize(vectors: np.ndarray) -> np.ndarray:
+        """Quantize vectors to one sign bit per dimension, packed into bytes."""
+        return np.packbits(vectors > 0, axis=1)
+
+    def _configure_search(self):
+        """Apply query-time parameters (not all of them survive a save/load)."""
+        if isinstance(self.index, faiss.IndexIDMap):
+            base = faiss.downcast_index(self.index.index)
+            if isinstance(base, faiss.IndexRefine):
+                base = faiss.downcast_index(base.base_index)
+            if isinstance(base, faiss.IndexHNSW):
+                base.hnsw.efSearch = HNSW_EF_SEARCH
 
     def add_vectors(self, vectors: np.ndarray, ids: List[str]):
         """Add embedding vectors to the index.
@@ -31,14 +181,52 @@ class VectorStore:
         if len(ids) != len(vectors):
             raise ValueError("Number of IDs must match number of vectors")
 
-        # Ensure vectors are float32 and contiguous
+        # Ensure vectors are float32, contiguous and unit length: all scoring
+        # relies on L2 distance between normalized vectors (== cosine)
         vectors = np.ascontiguousarray(vectors.astype(np.float32))
+        faiss.normalize_L2(vectors)
+
+        labels = np.fromiter((chunk_id_to_int64(i) for i in ids), dtype=np.int64, count=len(ids))
+        self.index.add_with_ids(vectors, labels)
+        if self.binary_index is not None:
+            self.binary_index.add_with_ids(self.binarize(vectors), labels)
+        self.ids.update(zip(labels.tolist(), ids))
+        if len(ids):
+            self._saved_path = None
+
+    def remove_vectors(self, ids: Iterable[str]) -> int:
+        """Remove the vectors of chunks from the index.
+
+        Flat indexes delete in place. HNSW graphs, int8 refinement and PQ
+        codes cannot, so those are rebuilt from the vectors that remain.
 
-        # Add to FAISS index
-        self.index.add(vectors)
+        Args:
+            ids: Chunk IDs to remove; IDs without a vector are ignored
+
+        Returns:
+            Number of vectors removed
+        """
+        labels = np.fromiter({label for label in map(chunk_id_to_int64, ids) if label in self.ids}, dtype=np.int64)
+        if not len(labels):
+            return 0
 
-        # Store IDs
-        self.ids.extend(ids)
+        selector = faiss.IDSelectorBatch(labels)
+        try:
+            self.index.remove_ids(selector)
+        except RuntimeError:
+            # Not supported by this index type: re-add everything else
+            removed = set(labels.tolist())
+            keep = np.fromiter((label for label in self.ids if label not in removed), dtype=np.int64)
+            vectors = self.index.reconstruct_batch(keep) if len(keep) else np.empty((0, self.index.d), np.float32)
+            self.index = self._build_index(self.index.d, self.index_type, self.vector_dtype)
+            self.index.add_with_ids(vectors, keep)
+
+        if self.binary_index is not None:
+            self.binary_index.remove_ids(selector)
+        for label in labels.tolist():
+            del self.ids[label]
+        self._saved_path = None
+        return len(labels)
 
     def search(self, query_vector: np.ndarray, top_k: int = 10) -> List[Tuple[str, float]]:
         """Search for similar vectors.
@@ -53,35 +241,84 @@ class VectorStore:
         if len(query_vector.shape) == 1:
             query_vector = query_vector.reshape(1, -1)
 
-        # Ensure query is float32 and contiguous
+        # Ensure query is float32, contiguous and unit length
         query_vector = np.ascontiguousarray(query_vector.astype(np.float32))
+        faiss.normalize_L2(query_vector)
 
         # Search
-        distances, indices = self.index.search(query_vector, top_k)
+        if self.binary_index is not None:
+            distances, indices = self._search_binary(query_vector, top_k)
+        else:
+            distances, indices = self.index.search(query_vector, top_k)
 
         # Convert to list of (id, distance) tuples
         results = []
         for dist, idx in zip(distances[0], indices[0]):
-            if idx < len(self.ids):  # Valid index
-                results.append((self.ids[idx], float(dist)))
+            chunk_id = self.ids.get(int(idx))  # -1 when fewer than top_k hits
+            if chunk_id is not None:
+                results.append((chunk_id, float(dist)))
 
         return results
 
+    def _search_binary(self, query_vector: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Hamming-scan the sign codes, then re-rank candidates by exact L2 distance.
+
+        Stored vectors and the query are unit length, so the distances come
+        from a single matrix-vector product: |v - q|^2 = 2 - 2 v.q
+        """
+        binary_index = self.binary_index
+        if binary_index is None:
+            raise RuntimeError("Binary prefilter is not enabled")
+
+        k = min(top_k * BINARY_RERANK_FACTOR, binary_index.ntotal)
+        if k == 0:
+            return np.empty((1, 0), dtype=np.float32), np.empty((1, 0), dtype=np.int64)
+
+        _, candidates = binary_index.search(self.binarize(query_vector), k)
+        candidates = candidates[0][candidates[0] >= 0]
+
+        vectors = self.index.reconstruct_batch(candidates)
+        distances = 2.0 - 2.0 * (vectors @ query_vector[0])
+        order = np.argsort(distances, kind="stable")[:top_k]
+
+        return distances[order][None], candidates[order][None]
+
     def save(self, filepath: Path):
         """Save index to disk.
 
+        Nothing is written if no vectors were added since the index was loaded
+        from or last saved to `filepath`. Each file is written to a temporary
+        name and renamed into place, so a concurrent reader never sees a
+        partially written index. A "pq" index that has reached PQ_MIN_VECTORS
+        is trained and converted to PQ codes first.
+
         Args:
             filepath: Path to save the index
         """
+        if self._saved_path == filepath:
+            return
+
+        # Training happens here rather than per batch in add_vectors, so it
+        # runs once per ingest
+        self._convert_to_pq()
+
         filepath.parent.mkdir(parents=True, exist_ok=True)
 
-        # Save FAISS index
-        faiss.write_index(self.index, str(filepath))
+        binary_index = self.binary_index
+        if binary_index is not None:
+            _write_atomic(filepath.with_suffix('.bin'),
+                          lambda tmp: faiss.write_index_binary(binary_index, str(tmp)))
 
         # Save ID mapping
-        id_file = filepath.with_suffix('.ids')
-        with open(id_file, 'wb') as f:
-            pickle.dump(self.ids, f)
+        def write_ids(tmp: Path):
+            with open(tmp, 'wb') as f:
+                pickle.dump(self.ids, f)
+
+        _write_atomic(filepath.with_suffix('.ids'), write_ids)
+
+        # Save FAISS index last: its mtime marks a completed save
+        _write_atomic(filepath, lambda tmp: faiss.write_index(self.index, str(tmp)))
+        self._saved_path = filepath
 
     def load(self, filepath: Path):
         """Load index from disk.
@@ -91,11 +328,49 @@ class VectorStore:
         """
         # Load FAISS index
         self.index = faiss.read_index(str(filepath))
+        self.binary_index = None
 
         # Load ID mapping
         id_file = filepath.with_suffix('.ids')
         with open(id_file, 'rb') as f:
-            self.ids = pickle.load(f)
+            ids = pickle.load(f)
+
+        migrated = isinstance(ids, list)
+        if migrated:
+            # Older indexes were unlabeled, with a list of IDs by position:
+            # rebuild them with explicit labels
+            vectors = self.index.reconstruct_n(0, self.index.ntotal)
+            self.index = self._build_index(self.index.d, self.index_type, self.vector_dtype)
+            self.ids = {}
+            self.add_vectors(vectors, ids)
+        else:
+            self.ids = ids
+            self._saved_path = filepath
+
+        binary_file = filepath.with_suffix('.bin')
+        if self.binary_prefilter and binary_file.exists():
+            self.binary_index = faiss.read_index_binary(str(binary_file))
+        if self.binary_prefilter and (self.binary_index is None or self.binary_index.ntotal != self.index.ntotal):
+            # Prefilter turned on for an existing index, or codes left over
+            # from before it was last turned off: derive them again
+            self.binary_index = self._build_binary_index(self.index.d)
+            labels = np.fromiter(self.ids, dtype=np.int64, count=len(self.ids))
+            if len(labels):
+                self.binary_index.add_with_ids(self.binarize(self.index.reconstruct_batch(labels)), labels)
+            self._saved_path = None
+        self._configure_search()
+
+        if migrated:
+            # Write the rebuilt index back so the migration (an HNSW rebuild
+            # for large indexes) runs once rather than on every load
+            try:
+                self.save(filepath)
+            except OSError as e:
+                logger.warning("Could not save migrated vector index %s: %s", filepath, e)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        """Check whether a chunk already has a vector in the index."""
+        return self.ids.get(chunk_id_to_int64(chunk_id)) == chunk_id
 
     @property
     def size(self) -> int:
@@ -104,4 +379,20 @@ class VectorStore:
 
     def __len__(self) -> int:
         """Get number of vectors in the index."""
-        return self.size
\ No newline at end of file
+        return self.size
+
+
+def _write_atomic(path: Path, write: Callable[[Path], None]):
+    """Write a file through `write(tmp_path)`, then rename it over `path`."""
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _unit_range(dimension: int) -> np.ndarray:
+    """Training data spanning [-1, 1] in every dimension, for 8-bit codes."""
+    return np.stack([-np.ones(dimension), np.ones(dimension)]).astype(np.float32)
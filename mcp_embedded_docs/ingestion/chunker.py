@@ -2,15 +2,34 @@
 
 import hashlib
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import orjson
 
 from .pdf_parser import Section
 from .table_extractor import RegisterTable
 
-# Sentence boundary pattern: period/question/exclamation followed by space or newline,
-# or a double newline (paragraph break)
-_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+|\n\n+')
+# Abbreviations common in datasheets and reference manuals whose trailing
+# period does not end a sentence ("see Fig. 3", "e.g. CAN0")
+_ABBREVIATIONS = (
+    "e.g.", "i.e.", "cf.", "vs.", "approx.", "incl.",
+    "Fig.", "fig.", "Figs.", "Eq.", "Sec.", "Ch.", "Ref.", "Rev.", "Vol.", "No.", "Tab.",
+)
+
+# Sentence boundary pattern: period/question/exclamation followed by space or newline
+# (unless the period ends one of the abbreviations above), or a double newline
+# (paragraph break). Each lookbehind is fixed-width, as `re` requires, and only
+# runs once a period has matched, so ordinary text pays nothing for them.
+_SENTENCE_BOUNDARY_RE = re.compile(
+    r'(?:[!?]|\.'
+    + ''.join(rf'(?<!\b{re.escape(abbr)})' for abbr in _ABBREVIATIONS)
+    + r')\s+|\n\n+'
+)
+
+# Paragraph break, used as a fallback when no sentence boundaries are found
+_PARA_BREAK_RE = re.compile(r'\n\n+')
 
 
 @dataclass
@@ -24,6 +43,7 @@ class Chunk:
     metadata: Dict[str, Any]
     page_start: int
     page_end: int
+    structured_json: Optional[str] = None  # Pre-serialized structured_data
 
 
 class SemanticChunker:
@@ -61,17 +81,26 @@ class SemanticChunker:
         Returns:
             List of chunks
         """
-        chunks = []
+        return list(self.iter_chunks(doc_id, sections, tables, doc_title, table_pages))
+
+    def iter_chunks(
+        self,
+        doc_id: str,
+        sections: List[Section],
+        tables: List[RegisterTable],
+        doc_title: str = "",
+        table_pages: Optional[Dict[int, int]] = None,
+    ) -> Iterator[Chunk]:
+        """Lazily create chunks from document sections and tables.
 
+        Same arguments and order as chunk_document(), but chunks are produced
+        one at a time so callers can embed and store them in batches.
+        """
         # First, create chunks for register tables (these are always kept intact)
-        table_chunks = self._chunk_tables(doc_id, tables, doc_title, table_pages or {})
-        chunks.extend(table_chunks)
+        yield from self._chunk_tables(doc_id, tables, doc_title, table_pages or {})
 
         # Then, create chunks for text sections (starting with no ancestors)
-        text_chunks = self._chunk_sections(doc_id, sections, doc_title, ancestors=[])
-        chunks.extend(text_chunks)
-
-        return chunks
+        yield from self._chunk_sections(doc_id, sections, doc_title, [])
 
     # ------------------------------------------------------------------
     # Contextual prefix
@@ -106,10 +135,8 @@ class SemanticChunker:
         tables: List[RegisterTable],
         doc_title: str,
         table_pages: Dict[int, int],
-    ) -> List[Chunk]:
+    ) -> Iterator[Chunk]:
         """Create chunks for register tables."""
-        chunks = []
-
         for i, table in enumerate(tables):
             # Build hierarchy from peripheral + context
             hierarchy: List[str] = []
@@ -121,11 +148,11 @@ class SemanticChunker:
             prefix = self._build_context_prefix(doc_title, hierarchy)
 
             # Convert table to both text and structured format
-            text = prefix + self._format_table_as_text(table)
-            structured = self._format_table_as_json(table)
+            body, structured = self._format_table(table)
+            text = prefix + body
 
             # Content-based chunk ID
-            chunk_hash = hashlib.md5(text.encode()).hexdigest()[:12]
+            chunk_hash = hashlib.blake2b(text.encode(), digest_size=6).hexdigest()
             chunk_id = f"{doc_id}_{chunk_hash}"
 
             page_num = table_pages.get(i, 0)
@@ -136,6 +163,7 @@ class SemanticChunker:
                 chunk_type=table.table_type.value,
                 text=text,
                 structured_data=structured,
+                structured_json=orjson.dumps(structured).decode(),
                 metadata={
                     "peripheral": table.peripheral,
                     "table_type": table.table_type.value,
@@ -146,9 +174,7 @@ class SemanticChunker:
                 page_end=page_num,
             )
 
-            chunks.append(chunk)
-
-        return chunks
+            yield chunk
 
     # ------------------------------------------------------------------
     # Section chunking
@@ -160,24 +186,24 @@ class SemanticChunker:
         sections: List[Section],
         doc_title: str,
         ancestors: List[str],
-    ) -> List[Chunk]:
+    ) -> Iterator[Chunk]:
         """Create chunks for text sections.
 
         Only leaf sections (those with no subsections) get their content
         chunked, avoiding duplicate text between parent and child sections.
+        Sections are walked depth-first with an explicit stack rather than
+        nested generators, so each chunk is yielded straight to the caller.
         """
-        chunks = []
+        stack: List[Tuple[Section, List[str]]] = [(s, ancestors) for s in reversed(sections)]
 
-        for section in sections:
-            current_hierarchy = ancestors + [section.title]
+        while stack:
+            section, section_ancestors = stack.pop()
+            current_hierarchy = section_ancestors + [section.title]
 
             if section.subsections:
-                # Non-leaf: recurse into subsections only — skip own content
+                # Non-leaf: descend into subsections only — skip own content
                 # to avoid duplicating text already covered by children
-                sub_chunks = self._chunk_sections(
-                    doc_id, section.subsections, doc_title, current_hierarchy
-                )
-                chunks.extend(sub_chunks)
+                stack.extend((sub, current_hierarchy) for sub in reversed(section.subsections))
             else:
                 # Leaf section: chunk its content
                 prefix = self._build_context_prefix(doc_title, current_hierarchy)
@@ -188,7 +214,7 @@ class SemanticChunker:
                 if len(prefix) + len(content) <= self.target_size:
                     # Fits in a single chunk
                     chunk_text = prefix + content
-                    chunk_hash = hashlib.md5(chunk_text.encode()).hexdigest()[:12]
+                    chunk_hash = hashlib.blake2b(chunk_text.encode(), digest_size=6).hexdigest()
 
                     chunk = Chunk(
                         id=f"{doc_id}_{chunk_hash}",
@@ -203,15 +229,10 @@ class SemanticChunker:
                         page_start=section.start_page,
                         page_end=section.end_page,
                     )
-                    chunks.append(chunk)
+                    yield chunk
                 else:
                     # Large section — split with sentence-aware boundaries
-                    split_chunks = self._split_section(
-                        doc_id, section, prefix
-                    )
-                    chunks.extend(split_chunks)
-
-        return chunks
+                    yield from self._split_section(doc_id, section, prefix)
 
     # ------------------------------------------------------------------
     # Sentence-aware splitting
@@ -228,19 +249,22 @@ class SemanticChunker:
             boundaries.append(m.end())
         return boundaries
 
-    def _split_section(self, doc_id: str, section: Section, prefix: str) -> List[Chunk]:
+    def _split_section(self, doc_id: str, section: Section, prefix: str) -> Iterator[Chunk]:
         """Split a large section into multiple chunks using sentence boundaries."""
-        chunks: List[Chunk] = []
         content = section.content.strip()
         boundaries = self._find_sentence_boundaries(content)
 
         # If no sentence boundaries found, fall back to splitting on double-newlines
         if not boundaries:
-            boundaries = [m.end() for m in re.finditer(r'\n\n+', content)]
+            boundaries = [m.end() for m in _PARA_BREAK_RE.finditer(content)]
 
         start = 0
         budget = self.target_size - len(prefix)  # room for actual text per chunk
 
+        # Every chunk starts with the same prefix: hash it once and copy the
+        # hasher state per chunk instead of re-hashing the prefix each time
+        prefix_hash = hashlib.blake2b(prefix.encode(), digest_size=6)
+
         while start < len(content):
             end = start + budget
 
@@ -248,17 +272,10 @@ class SemanticChunker:
                 # Remaining text fits
                 end = len(content)
             else:
-                # Find the last sentence boundary before `end`
-                best = None
-                for b in boundaries:
-                    if b <= start:
-                        continue
-                    if b <= end:
-                        best = b
-                    else:
-                        break
-                if best is not None:
-                    end = best
+                # Find the last sentence boundary in (start, end]
+                idx = bisect_right(boundaries, end) - 1
+                if idx >= 0 and boundaries[idx] > start:
+                    end = boundaries[idx]
                 # else: no boundary found — take the full budget (hard cut at word boundary)
                 else:
                     # Try to avoid cutting mid-word: back up to last space
@@ -266,10 +283,13 @@ class SemanticChunker:
                     if space_pos > start:
                         end = space_pos + 1
 
-            chunk_text = prefix + content[start:end].strip()
+            body = content[start:end].strip()
+            chunk_text = prefix + body
             if chunk_text.strip():
-                chunk_hash = hashlib.md5(chunk_text.encode()).hexdigest()[:12]
-                chunks.append(Chunk(
+                h = prefix_hash.copy()
+                h.update(body.encode())
+                chunk_hash = h.hexdigest()
+                yield Chunk(
                     id=f"{doc_id}_{chunk_hash}",
                     doc_id=doc_id,
                     chunk_type="text",
@@ -281,21 +301,22 @@ class SemanticChunker:
                     },
                     page_start=section.start_page,
                     page_end=section.end_page,
-                ))
+                )
 
             # Compute overlap: grab the last 1-2 sentences from the chunk we just created
-            overlap_start = self._compute_overlap_start(content, start, end)
+            overlap_start = self._compute_overlap_start(boundaries, start, end)
             start = overlap_start if overlap_start < end else end
 
-        return chunks
+    def _compute_overlap_start(self, boundaries: List[int], chunk_start: int, chunk_end: int) -> int:
+        """Find where the next chunk should start so that it overlaps the last 1-2 sentences.
 
-    def _compute_overlap_start(self, content: str, chunk_start: int, chunk_end: int) -> int:
-        """Find where the next chunk should start so that it overlaps the last 1-2 sentences."""
-        # Look for sentence boundaries in the region [chunk_end - overlap .. chunk_end]
+        `boundaries` is the sorted boundary list computed once for the section.
+        """
+        # Look for sentence boundaries in the region (chunk_end - overlap .. chunk_end]
         region_start = max(chunk_start, chunk_end - self.overlap)
-        boundaries_in_region = []
-        for m in _SENTENCE_BOUNDARY_RE.finditer(content, region_start, chunk_end):
-            boundaries_in_region.append(m.end())
+        lo = bisect_right(boundaries, region_start)
+        hi = bisect_right(boundaries, chunk_end)
+        boundaries_in_region = boundaries[lo:hi]
 
         if boundaries_in_region:
             # Start the next chunk from the beginning of the last sentence in the overlap zone
@@ -308,20 +329,26 @@ class SemanticChunker:
         return chunk_end
 
     # ------------------------------------------------------------------
-    # Table formatting (unchanged)
+    # Table formatting
     # ------------------------------------------------------------------
 
-    def _format_table_as_text(self, table: RegisterTable) -> str:
-        """Format register table as compact text."""
+    def _format_table(self, table: RegisterTable) -> Tuple[str, Dict[str, Any]]:
+        """Format register table as compact text and structured data in one pass.
+
+        Returns:
+            Tuple of (text, structured dict)
+        """
+        table_type = table.table_type.value
         lines = []
 
-        lines.append(f"# {table.peripheral} - {table.table_type.value.replace('_', ' ').title()}")
+        lines.append(f"# {table.peripheral} - {table_type.replace('_', ' ').title()}")
         lines.append("")
 
         if table.context:
             lines.append(f"Context: {table.context}")
             lines.append("")
 
+        registers = []
         for register in table.registers:
             lines.append(f"## {register.name}")
 
@@ -340,42 +367,38 @@ class SemanticChunker:
             if register.description:
                 lines.append(f"Description: {register.description}")
 
+            fields = []
             if register.fields:
                 lines.append("\nFields:")
                 for field in register.fields:
                     lines.append(f"  - {field.name} [{field.bits}]: {field.description} ({field.access})")
+                    fields.append({
+                        "name": field.name,
+                        "bits": field.bits,
+                        "bit_range": field.bit_range,
+                        "access": field.access,
+                        "description": field.description,
+                        "reset_value": field.reset_value
+                    })
 
             lines.append("")
 
-        return "\n".join(lines)
-
-    def _format_table_as_json(self, table: RegisterTable) -> Dict[str, Any]:
-        """Format register table as structured JSON."""
-        return {
+            registers.append({
+                "name": register.name,
+                "address": register.address,
+                "offset": register.offset,
+                "width": register.width,
+                "reset_value": register.reset_value,
+                "access": register.access,
+                "description": register.description,
+                "fields": fields
+            })
+
+        structured = {
             "peripheral": table.peripheral,
-            "table_type": table.table_type.value,
+            "table_type": table_type,
             "context": table.context,
-            "registers": [
-                {
-                    "name": reg.name,
-                    "address": reg.address,
-                    "offset": reg.offset,
-                    "width": reg.width,
-                    "reset_value": reg.reset_value,
-                    "access": reg.access,
-                    "description": reg.description,
-                    "fields": [
-                        {
-                            "name": field.name,
-                            "bits": field.bits,
-                            "bit_range": field.bit_range,
-                            "access": field.access,
-                            "description": field.description,
-                            "reset_value": field.reset_value
-                        }
-                        for field in reg.fields
-                    ]
-                }
-                for reg in table.registers
-            ]
+            "registers": registers
         }
+
+        return "\n".join(lines), structured
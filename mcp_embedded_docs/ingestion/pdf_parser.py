@@ -2,11 +2,15 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+import multiprocessing
 import re
 
 import fitz  # PyMuPDF
 
+# Section headings like "45.3.2 Title"
+_SECTION_PATTERN = re.compile(r'^(\d+\.)+\d*\s+[A-Z]')
+
 
 @dataclass
 class TextBlock:
@@ -68,42 +72,55 @@ class PDFParser:
         if self.doc:
             self.doc.close()
 
+    @property
+    def page_count(self) -> int:
+        """Number of pages in the document."""
+        return len(self.doc)
+
     def extract_text_with_layout(self) -> List[Page]:
         """Extract text preserving layout structure."""
-        pages = []
-
-        for page_num in range(len(self.doc)):
-            page = self.doc[page_num]
-            blocks = []
-
-            # Extract text blocks with formatting
-            text_dict = page.get_text("dict")
-
-            for block in text_dict.get("blocks", []):
-                if block.get("type") == 0:  # Text block
-                    for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            text = span.get("text", "").strip()
-                            if text:
-                                blocks.append(TextBlock(
-                                    text=text,
-                                    bbox=tuple(span.get("bbox", [0, 0, 0, 0])),
-                                    font_size=span.get("size", 0),
-                                    font_name=span.get("font", ""),
-                                    page_num=page_num
-                                ))
-
-            raw_text = page.get_text()
-
-            pages.append(Page(
-                page_num=page_num,
-                width=page.rect.width,
-                height=page.rect.height,
-                blocks=blocks,
-                raw_text=raw_text
-            ))
-
-        return pages
+        return list(self.iter_pages())
+
+    def iter_pages(self) -> Iterator[Page]:
+        """Yield pages in order, so callers need not hold the whole document."""
+        for page_num in range(self.page_count):
+            yield self.extract_page(page_num)
+
+    def extract_page(self, page_num: int) -> Page:
+        """Extract a single page preserving layout structure."""
+        page = self.doc[page_num]
+        blocks = []
+
+        # Build the text page once and reuse it for both the layout dict and
+        # the raw text; TEXTFLAGS_TEXT also leaves out image blocks we ignore
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+
+        # Extract text blocks with formatting
+        text_dict = page.get_text("dict", textpage=textpage)
+
+        for block in text_dict.get("blocks", []):
+            if block.get("type") == 0:  # Text block
+                for line in block.get("lines", []):
+                    for span in line.get("spans", []):
+                        text = span.get("text", "").strip()
+                        if text:
+                            blocks.append(TextBlock(
+                                text=text,
+                                bbox=tuple(span.get("bbox", [0, 0, 0, 0])),
+                                font_size=span.get("size", 0),
+                                font_name=span.get("font", ""),
+                                page_num=page_num
+                            ))
+
+        raw_text = page.get_text(textpage=textpage)
+
+        return Page(
+            page_num=page_num,
+            width=page.rect.width,
+            height=page.rect.height,
+            blocks=blocks,
+            raw_text=raw_text
+        )
 
     def extract_toc(self) -> List[TOCEntry]:
         """Extract table of contents from PDF."""
@@ -120,84 +137,150 @@ class PDFParser:
 
         return toc_entries
 
-    def detect_sections(self, pages: List[Page], toc: List[TOCEntry]) -> List[Section]:
+    def detect_sections(self, pages: Iterable[Page], toc: List[TOCEntry]) -> List[Section]:
         """Identify section boundaries using font sizes and TOC."""
-        sections = []
+        builder = SectionBuilder(toc)
+        for page in pages:
+            builder.feed(page)
+        return builder.finish()
 
-        # If we have TOC, use it to define sections
-        if toc:
-            for i, entry in enumerate(toc):
-                # Determine end page
-                if i + 1 < len(toc):
-                    end_page = toc[i + 1].page_num - 1
-                else:
-                    end_page = len(pages) - 1
-
-                # Extract content for this section
-                content = ""
-                for page_num in range(entry.page_num, min(end_page + 1, len(pages))):
-                    if page_num < len(pages):
-                        content += pages[page_num].raw_text + "\n"
-
-                sections.append(Section(
-                    title=entry.title,
-                    level=entry.level,
-                    start_page=entry.page_num,
-                    end_page=end_page,
-                    content=content,
+    def extract_page_range(self, start_page: int, end_page: int) -> List[Page]:
+        """Extract a specific range of pages."""
+        pages = range(self.page_count)[start_page:end_page + 1]
+        return [self.extract_page(page_num) for page_num in pages]
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """Process start method for PDF worker pools.
+
+    Ingestion can run on a thread of the multi-threaded MCP server, and
+    forking a threaded process can deadlock, so workers are started from a
+    fork server where available and spawned otherwise.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _is_heading(block: TextBlock) -> bool:
+    """Whether a block starts a section when the document has no TOC."""
+    # Look for large font sizes or section number patterns
+    return block.font_size > 12 or bool(_SECTION_PATTERN.match(block.text))
+
+
+class SectionBuilder:
+    """Build document sections from pages fed one at a time, in page order.
+
+    With a TOC, sections follow its entries and only each page's raw text is
+    kept; without one, headings are detected from font sizes and numbering
+    as pages arrive. Either way the page layout blocks can be dropped as soon
+    as a page has been fed.
+    """
+
+    def __init__(self, toc: List[TOCEntry]):
+        """Initialize builder.
+
+        Args:
+            toc: Table of contents entries (may be empty)
+        """
+        self.toc = toc
+        self._page_count = 0
+        self._raw_texts: List[str] = []
+        self._sections: List[Section] = []
+        self._current: Optional[Section] = None
+
+    def feed(self, page: Page):
+        """Add the next page of the document."""
+        self._page_count += 1
+
+        if self.toc:
+            self._raw_texts.append(page.raw_text)
+            return
+
+        # Fallback: detect sections using font size and patterns
+        for block in page.blocks:
+            if _is_heading(block):
+                # Start new section
+                if self._current:
+                    self._current.end_page = page.page_num - 1
+                    self._sections.append(self._current)
+
+                # Determine level from numbering
+                level = block.text.count('.') + 1 if '.' in block.text else 1
+
+                self._current = Section(
+                    title=block.text,
+                    level=level,
+                    start_page=page.page_num,
+                    end_page=page.page_num,
+                    content="",
                     subsections=[]
-                ))
+                )
+
+        if self._current:
+            self._current.content += page.raw_text + "\n"
+
+    def outline(self, page: Page) -> Page:
+        """Copy of a page holding only what feed() reads from it.
+
+        With a TOC that is just the raw text; without one, the blocks that
+        could start a section. Worker processes return outlines instead of
+        whole pages to keep the layout blocks out of inter-process traffic.
+        """
+        blocks = [] if self.toc else [block for block in page.blocks if _is_heading(block)]
+        return Page(page.page_num, page.width, page.height, blocks, page.raw_text)
+
+    def finish(self) -> List[Section]:
+        """Return the section hierarchy for all pages fed so far."""
+        if self.toc:
+            sections = self._toc_sections()
         else:
-            # Fallback: detect sections using font size and patterns
-            sections = self._detect_sections_heuristic(pages)
+            sections = self._sections
+            # Add last section
+            if self._current:
+                self._current.end_page = self._page_count - 1
+                sections.append(self._current)
+                self._current = None
 
         # Build hierarchy
-        return self._build_section_hierarchy(sections)
+        return self._build_hierarchy(sections)
 
-    def _detect_sections_heuristic(self, pages: List[Page]) -> List[Section]:
-        """Detect sections using heuristics when no TOC available."""
+    def _toc_sections(self) -> List[Section]:
+        """Use the TOC entries to define sections."""
         sections = []
-        current_section = None
-        section_pattern = re.compile(r'^(\d+\.)+\d*\s+[A-Z]')  # Match "45.3.2 Title"
+        page_count = len(self._raw_texts)
 
-        for page in pages:
-            for block in page.blocks:
-                # Look for large font sizes or section number patterns
-                if block.font_size > 12 or section_pattern.match(block.text):
-                    # Start new section
-                    if current_section:
-                        current_section.end_page = page.page_num - 1
-                        sections.append(current_section)
-
-                    # Determine level from numbering
-                    level = block.text.count('.') + 1 if '.' in block.text else 1
-
-                    current_section = Section(
-                        title=block.text,
-                        level=level,
-                        start_page=page.page_num,
-                        end_page=page.page_num,
-                        content="",
-                        subsections=[]
-                    )
-
-            if current_section:
-                current_section.content += page.raw_text + "\n"
-
-        # Add last section
-        if current_section:
-            current_section.end_page = len(pages) - 1
-            sections.append(current_section)
+        for i, entry in enumerate(self.toc):
+            # Determine end page
+            if i + 1 < len(self.toc):
+                end_page = self.toc[i + 1].page_num - 1
+            else:
+                end_page = page_count - 1
+
+            # Extract content for this section
+            content = ""
+            for page_num in range(entry.page_num, min(end_page + 1, page_count)):
+                content += self._raw_texts[page_num] + "\n"
+
+            sections.append(Section(
+                title=entry.title,
+                level=entry.level,
+                start_page=entry.page_num,
+                end_page=end_page,
+                content=content,
+                subsections=[]
+            ))
 
         return sections
 
-    def _build_section_hierarchy(self, sections: List[Section]) -> List[Section]:
+    @staticmethod
+    def _build_hierarchy(sections: List[Section]) -> List[Section]:
         """Build hierarchical structure from flat section list."""
         if not sections:
             return []
 
         root_sections = []
-        stack = []
+        stack: List[Section] = []
 
         for section in sections:
             # Pop sections from stack that are not parents
@@ -214,8 +297,3 @@ class PDFParser:
             stack.append(section)
 
         return root_sections
-
-    def extract_page_range(self, start_page: int, end_page: int) -> List[Page]:
-        """Extract a specific range of pages."""
-        all_pages = self.extract_text_with_layout()
-        return all_pages[start_page:end_page + 1]
\ No newline at end of file
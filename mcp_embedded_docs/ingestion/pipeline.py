@@ -0,0 +1,334 @@
+"""Shared steps of the ingestion pipeline."""
+
+import hashlib
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .chunker import Chunk
+from .pdf_parser import Page, PDFParser, Section, SectionBuilder, worker_context
+from .table_detector import TableDetector
+from .table_extractor import RegisterTable, TableExtractor
+
+if TYPE_CHECKING:
+    from ..indexing.embedder import Embedder
+    from ..indexing.metadata_store import MetadataStore
+    from ..indexing.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# pdfplumber table extraction is slow enough that a few pages per worker
+# already pay for the process startup
+_MIN_PAGES_PER_WORKER = 4
+
+# Chunks embedded and written to the stores per round trip
+INDEX_BATCH_SIZE = 256
+
+# Per-process state for page parsing workers (parser, section outliner,
+# table detector, table extractor)
+_worker_state: Optional[Tuple[PDFParser, SectionBuilder, TableDetector, TableExtractor]] = None
+
+
+@dataclass
+class ParsedDocument:
+    """Sections and register tables extracted from a PDF."""
+    page_count: int
+    sections: List[Section]
+    tables: List[RegisterTable]
+    table_pages: Dict[int, int]  # table index -> page_num
+
+
+def document_id(path: Path) -> str:
+    """Derive a stable 16-hex-character document ID from the file contents.
+
+    Identical files get the same ID whatever they are called, and different
+    files sharing a name get different ones. The file is hashed through a
+    memory map, without copying it into Python.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:  # Empty files cannot be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+    return digest.hexdigest()
+
+
+def find_indexed_document(db_path: Path, doc_id: str) -> Optional[Dict[str, Any]]:
+    """Look up a document in the metadata db without creating the index.
+
+    Returns:
+        Document info dictionary, or None if it is not indexed
+    """
+    if not db_path.exists():
+        return None
+
+    from ..indexing.metadata_store import MetadataStore
+
+    with MetadataStore(db_path) as store:
+        return store.get_document(doc_id)
+
+
+def record_document(
+    metadata_store: "MetadataStore",
+    vector_store: "VectorStore",
+    doc_id: str,
+    path: Path,
+    title: Optional[str] = None,
+    version: Optional[str] = None,
+) -> int:
+    """Record an indexed PDF, replacing earlier versions of the same file.
+
+    Called once the chunks are stored, so a listed document is always fully
+    indexed. An edited file gets a new content-derived ID, so a document
+    ingested from the same resolved path under another ID is an earlier
+    version and is deleted with its chunks and vectors. So is a document from
+    an older index, which recorded no path and was keyed by the MD5 of the
+    filename.
+
+    The vector store is not saved; callers save it again afterwards.
+
+    Returns:
+        Number of vectors removed with earlier versions
+    """
+    source_path = str(path.resolve())
+    legacy_id = hashlib.md5(path.name.encode()).hexdigest()[:16]
+    replaced_chunks = metadata_store.delete_other_versions(doc_id, source_path, legacy_id)
+    metadata_store.add_document(
+        doc_id=doc_id,
+        filename=path.name,
+        title=title,
+        version=version,
+        source_path=source_path,
+    )
+    return vector_store.remove_vectors(replaced_chunks)
+
+
+def parse_document(pdf_path: Path, workers: Optional[int] = 1) -> ParsedDocument:
+    """Parse a PDF into sections and register tables in one pass over its pages.
+
+    Pages are streamed and dropped once their sections and tables have been
+    collected, so the layout blocks of the whole document are never held at
+    once. With several workers, each page is extracted and searched for
+    tables in the same worker process, which sends back only the tables and
+    the page outline that section detection needs.
+
+    Args:
+        pdf_path: Path to the PDF file
+        workers: Number of worker processes (None uses all CPUs, 1 runs in-process)
+
+    Returns:
+        Parsed document
+    """
+    with PDFParser(pdf_path) as parser:
+        page_count = parser.page_count
+        sections = SectionBuilder(parser.extract_toc())
+        table_workers = _table_workers(workers, page_count)
+
+        if table_workers <= 1:
+            extractor = TableExtractor(str(pdf_path))
+            with TableDetector(str(pdf_path)) as detector:
+                page_results = []
+                for page in parser.iter_pages():
+                    sections.feed(page)
+                    page_results.append(_detect_tables(detector, extractor, page))
+        else:
+            page_results = []
+            for outline, page_tables in _parse_pages_parallel(pdf_path, page_count, table_workers):
+                sections.feed(outline)
+                page_results.append(page_tables)
+
+    tables, table_pages = _collect_tables(page_results)
+    return ParsedDocument(page_count, sections.finish(), tables, table_pages)
+
+
+def _table_workers(workers: Optional[int], page_count: int) -> int:
+    """Number of table detection processes worth starting for a document."""
+    return min(workers or os.cpu_count() or 1, page_count // _MIN_PAGES_PER_WORKER)
+
+
+def _parse_pages_parallel(
+    pdf_path: Path,
+    page_count: int,
+    workers: int,
+) -> Iterator[Tuple[Page, List[Tuple[int, RegisterTable]]]]:
+    """Yield (page outline, tables) for every page, in page order."""
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=worker_context(),
+        initializer=_init_worker,
+        initargs=(str(pdf_path),),
+    ) as executor:
+        yield from executor.map(_parse_page, range(page_count), chunksize=_MIN_PAGES_PER_WORKER)
+
+
+def _collect_tables(
+    page_results: Iterable[List[Tuple[int, RegisterTable]]],
+) -> Tuple[List[RegisterTable], Dict[int, int]]:
+    """Flatten per-page results into (tables, mapping of table index -> page_num)."""
+    all_tables: List[RegisterTable] = []
+    table_pages: Dict[int, int] = {}
+    for page_tables in page_results:
+        for page_num, table in page_tables:
+            table_pages[len(all_tables)] = page_num
+            all_tables.append(table)
+
+    return all_tables, table_pages
+
+
+def embedding_key(embedding_id: str, text: str) -> bytes:
+    """Content hash identifying the embedding of `text` by the embedder `embedding_id`.
+
+    The ID covers the backend and precision as well as the model, so
+    switching either never reuses vectors computed under the other.
+    """
+    return hashlib.blake2b(f"{embedding_id}\0{text}".encode(), digest_size=16).digest()
+
+
+def index_chunks(
+    chunks: Iterable[Chunk],
+    embedder: "Embedder",
+    vector_store: "VectorStore",
+    metadata_store: "MetadataStore",
+    batch_size: int = INDEX_BATCH_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """Embed and store chunks in fixed-size batches.
+
+    Consuming the chunk stream a batch at a time keeps peak memory at one
+    batch of texts and embeddings instead of the whole document.
+
+    Chunk IDs are derived from the document ID, itself a hash of the file
+    contents, so a chunk whose ID is already in both stores is only skipped
+    when the same unchanged file is ingested again (e.g. resuming an
+    interrupted ingest). An edited PDF gets a new document ID and new chunk
+    IDs; its unchanged text is covered by the embedding cache instead. Chunks
+    that need a vector first look in the metadata store's cache, keyed by
+    embedder and text, so unchanged text is only embedded once even under a
+    new document ID.
+
+    Args:
+        chunks: Chunks to index (typically SemanticChunker.iter_chunks())
+        embedder: Embedder used for the vectors
+        vector_store: Vector store receiving the embeddings
+        metadata_store: Metadata store receiving the chunk rows
+        batch_size: Number of chunks per batch
+        progress: Called after each batch with the number of chunks
+            processed and embedded so far
+
+    Returns:
+        Number of chunks in the document (including skipped ones)
+    """
+    count = 0
+    skipped = 0
+    embedded = 0
+    seen: Set[str] = set()
+    chunk_iter = iter(chunks)
+
+    while True:
+        batch = list(islice(chunk_iter, batch_size))
+        if not batch:
+            break
+        count += len(batch)
+
+        stored = metadata_store.existing_chunk_ids([chunk.id for chunk in batch])
+        need_vector: List[Chunk] = []
+        need_row: List[Chunk] = []
+        for chunk in batch:
+            # Identical text repeated within the document maps to one ID
+            if chunk.id in seen:
+                skipped += 1
+                continue
+            seen.add(chunk.id)
+
+            has_vector = chunk.id in vector_store
+            if not has_vector:
+                need_vector.append(chunk)
+            if chunk.id not in stored:
+                need_row.append(chunk)
+            if has_vector and chunk.id in stored:
+                skipped += 1
+
+        if need_vector:
+            embedded += _add_vectors(need_vector, embedder, vector_store, metadata_store)
+        if need_row:
+            metadata_store.add_chunks(need_row)
+        if progress:
+            progress(count, embedded)
+
+    if skipped:
+        logger.info("Skipped %d of %d chunks that were already indexed", skipped, count)
+    logger.info("Embedded %d chunks", embedded)
+
+    return count
+
+
+def _add_vectors(
+    chunks: List[Chunk],
+    embedder: "Embedder",
+    vector_store: "VectorStore",
+    metadata_store: "MetadataStore",
+) -> int:
+    """Add vectors for chunks, embedding only texts missing from the cache.
+
+    Returns:
+        Number of chunks that had to be embedded
+    """
+    keys = [embedding_key(embedder.embedding_id, chunk.text) for chunk in chunks]
+    cached = metadata_store.get_cached_embeddings(keys)
+
+    misses = [i for i, key in enumerate(keys) if key not in cached]
+    if misses:
+        embeddings = embedder.embed_batch([chunks[i].text for i in misses])
+        miss_keys = [keys[i] for i in misses]
+        metadata_store.cache_embeddings(miss_keys, embeddings)
+        cached.update(zip(miss_keys, embeddings))
+
+    vectors = np.stack([cached[key] for key in keys])
+    vector_store.add_vectors(vectors, [chunk.id for chunk in chunks])
+
+    return len(misses)
+
+
+def _detect_tables(
+    detector: TableDetector,
+    extractor: TableExtractor,
+    page: Page,
+) -> List[Tuple[int, RegisterTable]]:
+    """Detect and extract the register tables on a single page."""
+    tables = []
+    for region in detector.detect_register_tables(page):
+        context = detector.detect_table_context(page, region)
+        table = extractor.extract_register_table(region, context)
+        if table:
+            tables.append((region.page_num, table))
+    return tables
+
+
+def _init_worker(pdf_path: str):
+    """Open the PDF once per worker process."""
+    global _worker_state
+    parser = PDFParser(Path(pdf_path))
+    detector = TableDetector(pdf_path).__enter__()
+
+    # Both documents stay open for the worker's lifetime; close them when it exits
+    Finalize(parser, parser.close, exitpriority=0)
+    Finalize(detector, detector.__exit__, args=(None, None, None), exitpriority=0)
+
+    _worker_state = (parser, SectionBuilder(parser.extract_toc()), detector, TableExtractor(pdf_path))
+
+
+def _parse_page(page_num: int) -> Tuple[Page, List[Tuple[int, RegisterTable]]]:
+    """Worker entry point: extract one page, returning its outline and tables."""
+    if _worker_state is None:
+        raise RuntimeError("Page parsing worker was not initialized")
+    parser, sections, detector, extractor = _worker_state
+    page = parser.extract_page(page_num)
+    return sections.outline(page), _detect_tables(detector, extractor, page)
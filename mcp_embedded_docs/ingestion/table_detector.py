@@ -2,12 +2,28 @@
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Set, Tuple, Optional
+from typing import List, Set, Tuple
 import re
 
 import pdfplumber
 
-from .pdf_parser import Page, TextBlock
+from .pdf_parser import Page
+
+# Common header keywords for different table types
+REGISTER_MAP_HEADERS = frozenset({
+    "address", "offset", "register", "name", "width", "reset", "access", "description"
+})
+
+BITFIELD_HEADERS = frozenset({
+    "field", "bit", "bits", "range", "type", "access", "reset", "description"
+})
+
+MEMORY_MAP_HEADERS = frozenset({
+    "peripheral", "base", "address", "size", "description"
+})
+
+# Punctuation stripped from header text before keyword matching
+_PUNCT_RE = re.compile(r'[^\w\s]')
 
 
 class TableType(Enum):
@@ -31,18 +47,10 @@ class TableRegion:
 class TableDetector:
     """Detects register tables in PDF pages."""
 
-    # Common header keywords for different table types
-    REGISTER_MAP_HEADERS = {
-        "address", "offset", "register", "name", "width", "reset", "access", "description"
-    }
-
-    BITFIELD_HEADERS = {
-        "field", "bit", "bits", "range", "type", "access", "reset", "description"
-    }
-
-    MEMORY_MAP_HEADERS = {
-        "peripheral", "base", "address", "size", "description"
-    }
+    # Header keyword sets, also exposed on the class
+    REGISTER_MAP_HEADERS = REGISTER_MAP_HEADERS
+    BITFIELD_HEADERS = BITFIELD_HEADERS
+    MEMORY_MAP_HEADERS = MEMORY_MAP_HEADERS
 
     # Keywords that indicate proximity to register tables
     TABLE_CONTEXT_KEYWORDS = {
@@ -110,8 +118,9 @@ class TableDetector:
                 header_keywords = self._extract_keywords_from_text(header_text)
 
                 # Check if this is a register-related table
-                if self._is_likely_table_header(header_keywords):
-                    table_type = self._classify_table_type(header_keywords)
+                scores = self._header_scores(header_keywords)
+                if self._is_likely_table_header(scores):
+                    table_type = self._classify_table_type(scores)
 
                     # Create a table region with the table index
                     tables.append(TableRegion(
@@ -127,33 +136,6 @@ class TableDetector:
 
         return tables
 
-    def _group_blocks_into_rows(self, blocks: List[TextBlock], tolerance: float = 5.0) -> List[List[TextBlock]]:
-        """Group text blocks into rows based on y-coordinate."""
-        if not blocks:
-            return []
-
-        # Sort blocks by y-coordinate
-        sorted_blocks = sorted(blocks, key=lambda b: b.bbox[1])
-
-        rows = []
-        current_row = [sorted_blocks[0]]
-        current_y = sorted_blocks[0].bbox[1]
-
-        for block in sorted_blocks[1:]:
-            if abs(block.bbox[1] - current_y) <= tolerance:
-                # Same row
-                current_row.append(block)
-            else:
-                # New row
-                rows.append(sorted(current_row, key=lambda b: b.bbox[0]))  # Sort by x
-                current_row = [block]
-                current_y = block.bbox[1]
-
-        if current_row:
-            rows.append(sorted(current_row, key=lambda b: b.bbox[0]))
-
-        return rows
-
     def _extract_keywords_from_text(self, text: str) -> Set[str]:
         """Extract keywords from text."""
         keywords = set()
@@ -161,7 +143,7 @@ class TableDetector:
         # Normalize text
         text = text.lower().strip()
         # Remove common punctuation
-        text = re.sub(r'[^\w\s]', '', text)
+        text = _PUNCT_RE.sub('', text)
 
         # Split into words and extract meaningful keywords
         words = text.split()
@@ -171,90 +153,28 @@ class TableDetector:
 
         return keywords
 
-    def _extract_header_keywords(self, row: List[TextBlock]) -> Set[str]:
-        """Extract keywords from a potential header row."""
-        keywords = set()
-
-        for block in row:
-            text = block.text.lower().strip()
-            # Remove common punctuation
-            text = re.sub(r'[^\w\s]', '', text)
-            keywords.add(text)
-
-        return keywords
-
-    def _is_likely_table_header(self, keywords: Set[str]) -> bool:
-        """Determine if keywords suggest this is a table header."""
-        # Check for register map headers
-        register_match = len(keywords & self.REGISTER_MAP_HEADERS)
-        if register_match >= 3:
-            return True
-
-        # Check for bitfield headers
-        bitfield_match = len(keywords & self.BITFIELD_HEADERS)
-        if bitfield_match >= 3:
-            return True
-
-        # Check for memory map headers
-        memory_match = len(keywords & self.MEMORY_MAP_HEADERS)
-        if memory_match >= 2:
-            return True
-
-        return False
-
-    def _extract_table_region(self, page: Page, rows: List[List[TextBlock]], header_row_idx: int) -> Optional[TableRegion]:
-        """Extract the bounding box of a table starting from header row."""
-        if header_row_idx >= len(rows):
-            return None
-
-        header_row = rows[header_row_idx]
-        header_keywords = self._extract_header_keywords(header_row)
-
-        # Determine table type
-        table_type = self._classify_table_type(header_keywords)
-
-        # Find table boundaries
-        x0 = min(block.bbox[0] for block in header_row)
-        x1 = max(block.bbox[2] for block in header_row)
-        y0 = min(block.bbox[1] for block in header_row)
+    def _header_scores(self, keywords: Set[str]) -> Tuple[int, int, int]:
+        """Count header keyword matches per table type.
 
-        # Find where table ends (look for rows with similar column structure)
-        num_cols = len(header_row)
-        y1 = y0
-
-        for i in range(header_row_idx + 1, len(rows)):
-            row = rows[i]
-
-            # Check if row has similar structure
-            if len(row) < max(2, num_cols - 2):  # Allow some variation
-                break
-
-            # Check if row is within similar x boundaries
-            row_x0 = min(block.bbox[0] for block in row)
-            row_x1 = max(block.bbox[2] for block in row)
-
-            if abs(row_x0 - x0) > 50 or abs(row_x1 - x1) > 50:
-                break
-
-            # Update bottom boundary
-            y1 = max(block.bbox[3] for block in row)
+        Returns:
+            Tuple of (register_map, bitfield, memory_map) match counts
+        """
+        return (
+            len(keywords & REGISTER_MAP_HEADERS),
+            len(keywords & BITFIELD_HEADERS),
+            len(keywords & MEMORY_MAP_HEADERS),
+        )
 
-        # Only return if we found at least a few rows
-        if y1 - y0 < 20:  # Minimum table height
-            return None
+    def _is_likely_table_header(self, scores: Tuple[int, int, int]) -> bool:
+        """Determine if header keyword scores suggest this is a table header."""
+        register_match, bitfield_match, memory_match = scores
 
-        return TableRegion(
-            page_num=page.page_num,
-            bbox=(x0, y0, x1, y1),
-            table_type=table_type,
-            header_keywords=header_keywords
-        )
+        # Register map or bitfield headers need 3 matches, memory maps 2
+        return register_match >= 3 or bitfield_match >= 3 or memory_match >= 2
 
-    def _classify_table_type(self, keywords: Set[str]) -> TableType:
-        """Classify table type based on header keywords."""
-        register_score = len(keywords & self.REGISTER_MAP_HEADERS)
-        bitfield_score = len(keywords & self.BITFIELD_HEADERS)
-        memory_score = len(keywords & self.MEMORY_MAP_HEADERS)
+    def _classify_table_type(self, scores: Tuple[int, int, int]) -> TableType:
+        """Classify table type based on header keyword scores."""
+        register_score, bitfield_score, memory_score = scores
 
         max_score = max(register_score, bitfield_score, memory_score)
 
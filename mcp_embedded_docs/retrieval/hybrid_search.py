@@ -3,7 +3,7 @@
 from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 
-from ..indexing.embedder import LocalEmbedder
+from ..indexing.embedder import get_embedder
 from ..indexing.vector_store import VectorStore
 from ..indexing.metadata_store import MetadataStore
 from ..config import Config
@@ -22,14 +22,16 @@ class HybridSearch:
         self.config = config
 
         # Initialize components
-        self.embedder = LocalEmbedder(
-            model_name=config.embeddings.model,
-            device=config.embeddings.device
-        )
+        self.embedder = get_embedder(config)
 
         # Initialize stores (will be loaded if they exist)
         index_dir = config.index.directory
-        self.vector_store = VectorStore(dimension=self.embedder.dimension)
+        self.vector_store = VectorStore(
+            dimension=self.embedder.dimension,
+            index_type=config.index.vector_index,
+            vector_dtype=config.index.vector_dtype,
+            binary_prefilter=config.index.binary_prefilter,
+        )
         self.metadata_store = MetadataStore(index_dir / config.index.metadata_db)
 
         # Try to load existing index
@@ -1,20 +1,18 @@
 """Ingest documentation tool."""
 
-import hashlib
+import asyncio
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
 from ..config import Config
-from ..ingestion.pdf_parser import PDFParser
-from ..ingestion.table_detector import TableDetector
-from ..ingestion.table_extractor import TableExtractor
-from ..ingestion.chunker import SemanticChunker
-from ..indexing.embedder import LocalEmbedder
-from ..indexing.vector_store import VectorStore
-from ..indexing.metadata_store import MetadataStore
 
 logger = logging.getLogger(__name__)
 
+# Ingests load, extend and save the same vector index file, so that part runs
+# one document at a time (parsing and table extraction can still overlap)
+_ingest_lock = threading.Lock()
+
 
 async def ingest_docs(doc_path: str, title: Optional[str] = None, version: Optional[str] = None,
                       config: Optional[Config] = None) -> str:
@@ -42,118 +40,106 @@ async def ingest_docs(doc_path: str, title: Optional[str] = None, version: Optio
     if not doc_path_obj.suffix.lower() == '.pdf':
         return f"❌ Error: Currently only PDF files are supported. Got: {doc_path_obj.suffix}"
 
-    try:
-        # Generate document ID from filename
-        doc_id = hashlib.md5(doc_path_obj.name.encode()).hexdigest()[:16]
-
-        lines = [f"# Ingesting: {doc_path_obj.name}", ""]
-
-        # Parse PDF
-        lines.append("## 1️⃣ Parsing PDF...")
-        with PDFParser(doc_path_obj) as parser:
-            pages = parser.extract_text_with_layout()
-            toc = parser.extract_toc()
-            sections = parser.detect_sections(pages, toc)
-
-        lines.append(f"✓ Extracted {len(pages)} pages, {len(sections)} sections")
-        lines.append("")
-
-        # Detect and extract tables
-        lines.append("## 2️⃣ Detecting register tables...")
-        extractor = TableExtractor(str(doc_path_obj))
-
-        all_tables = []
-        table_pages: dict[int, int] = {}  # table index -> page_num
-        with TableDetector(str(doc_path_obj)) as detector:
-            for page in pages:
-                table_regions = detector.detect_register_tables(page)
-
-                for region in table_regions:
-                    context = detector.detect_table_context(page, region)
-                    table = extractor.extract_register_table(region, context)
-                    if table:
-                        table_pages[len(all_tables)] = region.page_num
-                        all_tables.append(table)
-
-        lines.append(f"✓ Found {len(all_tables)} register tables")
-        lines.append("")
-
-        # Create chunks
-        lines.append("## 3️⃣ Creating semantic chunks...")
-        chunker = SemanticChunker(
-            target_size=config.chunking.target_size,
-            overlap=config.chunking.overlap,
-            preserve_tables=config.chunking.preserve_tables
-        )
+    # The pipeline is CPU/GPU-bound and blocking: run it off the event loop
+    return await asyncio.to_thread(_ingest, doc_path_obj, title, version, config)
 
-        doc_title = title or doc_path_obj.stem
-        chunks = chunker.chunk_document(
-            doc_id, sections, all_tables,
-            doc_title=doc_title,
-            table_pages=table_pages,
-        )
-        lines.append(f"✓ Created {len(chunks)} chunks")
-        lines.append("")
 
-        # Initialize indexing components
-        lines.append("## 4️⃣ Creating embeddings and indexing...")
-        embedder = LocalEmbedder(
-            model_name=config.embeddings.model,
-            device=config.embeddings.device
-        )
+def _ingest(doc_path_obj: Path, title: Optional[str], version: Optional[str], config: Config) -> str:
+    """Parse, chunk, embed and index a PDF, returning the status message."""
+    # Imported at call time so the server starts without PyMuPDF/pdfplumber,
+    # and only loads FAISS and the embedding stack once parsing has succeeded
+    from ..ingestion.pipeline import (
+        document_id, find_indexed_document, index_chunks, parse_document, record_document,
+    )
+    from ..ingestion.chunker import SemanticChunker
+
+    try:
+        # Generate document ID from the file contents
+        doc_id = document_id(doc_path_obj)
+        idx_dir = config.index.directory
+        metadata_path = idx_dir / config.index.metadata_db
+
+        # Identical contents are already searchable: skip the whole pipeline
+        existing = find_indexed_document(metadata_path, doc_id)
+        if existing:
+            return (
+                f"✅ **{doc_path_obj.name} is already indexed** (as {existing['filename']})\n"
+                f"\n"
+                f"- **Document ID:** `{doc_id}`\n"
+                f"\n"
+                f"Use remove_docs first to index it again."
+            )
 
-        vector_store = VectorStore(dimension=embedder.dimension)
-        metadata_store = MetadataStore(config.index.directory / config.index.metadata_db)
+        # Parse PDF and detect tables in one pass over the pages
+        parsed = parse_document(doc_path_obj, workers=config.ingestion.workers)
+        sections, all_tables, table_pages = parsed.sections, parsed.tables, parsed.table_pages
 
-        # Add document metadata
-        metadata_store.add_document(
-            doc_id=doc_id,
-            filename=doc_path_obj.name,
-            title=title,
-            version=version
-        )
+        # Initialize indexing components
+        from ..indexing.embedder import get_embedder
+        from ..indexing.vector_store import VectorStore
+        from ..indexing.metadata_store import MetadataStore
+
+        embedder = get_embedder(config)
+
+        with _ingest_lock:
+            # Add to the existing index so earlier documents (and unchanged
+            # chunks of this one) are kept
+            vector_store = VectorStore(
+                dimension=embedder.dimension,
+                index_type=config.index.vector_index,
+                vector_dtype=config.index.vector_dtype,
+                binary_prefilter=config.index.binary_prefilter,
+            )
+            vector_path = idx_dir / config.index.vector_file
+            if vector_path.exists():
+                vector_store.load(vector_path)
+            idx_dir.mkdir(parents=True, exist_ok=True)
+            metadata_store = MetadataStore(metadata_path)
+
+            # Stream chunks through embedding and storage in batches
+            chunker = SemanticChunker(
+                target_size=config.chunking.target_size,
+                overlap=config.chunking.overlap,
+                preserve_tables=config.chunking.preserve_tables
+            )
 
-        # Process chunks
-        chunk_texts = [chunk.text for chunk in chunks]
-        chunk_ids = [chunk.id for chunk in chunks]
-
-        # Create embeddings
-        embeddings = embedder.embed_batch(chunk_texts, show_progress=False)
-
-        # Add to vector store
-        vector_store.add_vectors(embeddings, chunk_ids)
-
-        # Add to metadata store
-        for chunk in chunks:
-            metadata_store.add_chunk(
-                chunk_id=chunk.id,
-                doc_id=chunk.doc_id,
-                chunk_type=chunk.chunk_type,
-                text=chunk.text,
-                page_start=chunk.page_start,
-                page_end=chunk.page_end,
-                structured_data=chunk.structured_data,
-                metadata=chunk.metadata
+            doc_title = title or doc_path_obj.stem
+            chunks = chunker.iter_chunks(
+                doc_id, sections, all_tables,
+                doc_title=doc_title,
+                table_pages=table_pages,
             )
+            chunk_count = index_chunks(chunks, embedder, vector_store, metadata_store)
 
-        # Save vector store
-        config.index.directory.mkdir(parents=True, exist_ok=True)
-        vector_store.save(config.index.directory / config.index.vector_file)
+            # Save vector store
+            vector_store.save(vector_path)
 
-        metadata_store.close()
+            # Add document metadata last, replacing earlier versions of the
+            # file, then save again without their vectors
+            record_document(metadata_store, vector_store, doc_id, doc_path_obj, title=title, version=version)
+            vector_store.save(vector_path)
 
-        lines.append(f"✓ Completed indexing")
-        lines.append("")
-        lines.append("---")
-        lines.append("")
-        lines.append(f"✅ **Successfully indexed {doc_path_obj.name}**")
-        lines.append("")
-        lines.append(f"- **Document ID:** `{doc_id}`")
-        lines.append(f"- **Total chunks:** {len(chunks)}")
-        lines.append(f"- **Register tables:** {len(all_tables)}")
+        metadata_store.close()
 
-        return "\n".join(lines)
+        return (
+            f"# Ingesting: {doc_path_obj.name}\n"
+            f"\n"
+            f"## 1️⃣ Parsing PDF and detecting register tables...\n"
+            f"✓ Extracted {parsed.page_count} pages, {len(sections)} sections\n"
+            f"✓ Found {len(all_tables)} register tables\n"
+            f"\n"
+            f"## 2️⃣ Chunking, embedding and indexing...\n"
+            f"✓ Indexed {chunk_count} chunks\n"
+            f"\n"
+            f"---\n"
+            f"\n"
+            f"✅ **Successfully indexed {doc_path_obj.name}**\n"
+            f"\n"
+            f"- **Document ID:** `{doc_id}`\n"
+            f"- **Total chunks:** {chunk_count}\n"
+            f"- **Register tables:** {len(all_tables)}"
+        )
 
     except Exception as e:
-        logger.exception("Ingestion failed for %s", doc_path)
+        logger.exception("Ingestion failed for %s", doc_path_obj)
         return f"**Error during ingestion:** {str(e)}"
\ No newline at end of file
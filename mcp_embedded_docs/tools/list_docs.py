@@ -1,14 +1,25 @@
 """List documents tool."""
 
 import logging
+import os
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from ..indexing.metadata_store import MetadataStore
 from ..config import Config
 
 logger = logging.getLogger(__name__)
 
+# Rendered listings are reused for this long, unless the index changed
+_CACHE_TTL = 2.0
+
+# (doc dirs, db path) -> (created at, index mtimes, rendered listing)
+_listing_cache: Dict[Tuple, Tuple[float, Tuple, str]] = {}
+
+# db path -> (file identity, open store), reused across listings
+_stores: Dict[Path, Tuple[Tuple[int, int], MetadataStore]] = {}
+
 
 async def list_docs(config: Optional[Config] = None) -> str:
     """List all PDF files in doc directories and their index status.
@@ -22,45 +33,112 @@ async def list_docs(config: Optional[Config] = None) -> str:
     if config is None:
         config = Config.load()
 
-    # Lightweight DB check for indexed status
     db_path = config.index.directory / config.index.metadata_db
-    indexed_filenames: dict = {}
-    if db_path.exists():
-        store = MetadataStore(db_path)
+
+    # Repeated calls within the TTL skip the directory scan, but any write to
+    # the index (which touches the db or its WAL) invalidates the cache
+    key = (tuple(str(d) for d in config.doc_dirs), str(db_path))
+    index_mtimes = _index_mtimes(db_path)
+    cached = _listing_cache.get(key)
+    if cached and time.monotonic() - cached[0] < _CACHE_TTL and cached[1] == index_mtimes:
+        return cached[2]
+
+    listing = _render_listing(config, db_path)
+    _listing_cache[key] = (time.monotonic(), index_mtimes, listing)
+    return listing
+
+
+def _index_mtimes(db_path: Path) -> Tuple:
+    """Modification times of the metadata db and its WAL (None if missing)."""
+    mtimes: List[Optional[int]] = []
+    for path in (db_path, db_path.with_name(db_path.name + "-wal")):
         try:
-            for doc in store.list_documents():
-                indexed_filenames[doc['filename']] = doc
-        finally:
-            store.close()
-
-    # Scan doc directories for PDF files
-    all_pdfs = []
-    for doc_dir in config.doc_dirs:
-        if not doc_dir.exists():
-            continue
-        for pdf_path in doc_dir.glob("**/*.pdf"):
-            all_pdfs.append({
-                'path': pdf_path,
-                'name': pdf_path.name,
-                'size_mb': pdf_path.stat().st_size / (1024 * 1024),
-                'indexed': pdf_path.name in indexed_filenames,
-            })
+            mtimes.append(path.stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _render_listing(config: Config, db_path: Path) -> str:
+    """Scan doc directories and format them with their index status."""
+    indexed_filenames = _indexed_documents(db_path)
+
+    # Scan doc directories for PDF files: (not indexed, name, size in bytes)
+    all_pdfs = [
+        (pdf_path.name not in indexed_filenames, pdf_path.name, size)
+        for doc_dir in config.doc_dirs
+        if doc_dir.exists()
+        for pdf_path, size in _iter_pdfs(doc_dir)
+    ]
 
     if not all_pdfs:
         return f"No PDF files found in: {', '.join(str(d) for d in config.doc_dirs)}"
 
-    all_pdfs.sort(key=lambda x: (not x['indexed'], x['name']))
+    # Indexed first, then by name
+    all_pdfs.sort(key=lambda pdf: pdf[:2])
+    indexed_count = sum(1 for not_indexed, _, _ in all_pdfs if not not_indexed)
+
+    header = f"# Documentation\n\n**{len(all_pdfs)}** PDFs found ({indexed_count} indexed)\n\n"
+    return header + "\n".join(
+        _format_entry(name, size, None if not_indexed else indexed_filenames[name])
+        for not_indexed, name, size in all_pdfs
+    )
 
-    lines = ["# Documentation", ""]
-    indexed_count = sum(1 for p in all_pdfs if p['indexed'])
-    lines.append(f"**{len(all_pdfs)}** PDFs found ({indexed_count} indexed)")
-    lines.append("")
 
-    for pdf in all_pdfs:
-        status = "indexed" if pdf['indexed'] else "not indexed"
-        lines.append(f"- **{pdf['name']}** ({pdf['size_mb']:.1f} MB) — {status}")
-        if pdf['indexed']:
-            doc = indexed_filenames[pdf['name']]
-            lines.append(f"  - ID: `{doc['id']}`")
+def _indexed_documents(db_path: Path) -> Dict[str, dict]:
+    """Indexed documents by filename (empty if there is no index yet).
 
-    return "\n".join(lines)
\ No newline at end of file
+    The connection is kept open between calls, so listings skip the
+    connection setup and schema checks; it is reopened if the database file
+    is replaced.
+    """
+    try:
+        stat = db_path.stat()
+    except OSError:
+        return {}
+
+    identity = (stat.st_dev, stat.st_ino)
+    cached = _stores.get(db_path)
+    if cached is None or cached[0] != identity:
+        if cached is not None:
+            cached[1].close()
+        cached = (identity, MetadataStore(db_path))
+        _stores[db_path] = cached
+
+    # Newest first: if an index still holds several versions of a file,
+    # keep the latest one
+    documents: Dict[str, dict] = {}
+    for doc in cached[1].list_documents():
+        documents.setdefault(doc['filename'], doc)
+    return documents
+
+
+def _format_entry(name: str, size: int, doc: Optional[dict]) -> str:
+    """Format one PDF as a markdown list item (with its ID if indexed)."""
+    size_mb = size / (1024 * 1024)
+    if doc is None:
+        return f"- **{name}** ({size_mb:.1f} MB) — not indexed"
+    return f"- **{name}** ({size_mb:.1f} MB) — indexed\n  - ID: `{doc['id']}`"
+
+
+def _iter_pdfs(doc_dir: Path) -> Iterator[Tuple[Path, int]]:
+    """Recursively yield (path, size in bytes) for every PDF under doc_dir.
+
+    Walks with os.scandir, whose entries carry the file type from the
+    directory listing and cache their stat() result, so each file costs at
+    most one stat call (none for the type check on most filesystems).
+    Symlinked directories are not followed, so a link back up the tree
+    cannot make the walk loop.
+    """
+    stack = [doc_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                        yield Path(entry.path), entry.stat().st_size
+        except OSError:
+            # Unreadable directory: skip it, as glob() did
+            continue
@@ -0,0 +1,42 @@
+"""Tests for the SQLite metadata store."""
+
+import pytest
+
+from mcp_embedded_docs.indexing.metadata_store import MetadataStore
+
+
+@pytest.fixture
+def metadata_store(tmp_path):
+    with MetadataStore(tmp_path / "metadata.db") as store:
+        store.add_document("doc", "spec.pdf")
+        store.add_chunk("doc_ftm", "doc", "text", "What is FTM_SC? The FTM status and control register.", 1, 1)
+        store.add_chunk("doc_can", "doc", "text", "CAN0-MCR is the module configuration register.", 2, 2)
+        store.add_chunk("doc_not", "doc", "text", "Writes are NOT allowed while the module is enabled.", 3, 3)
+        yield store
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("what is FTM_SC?", '"what" "is" "FTM_SC"'),
+    ("CAN0-MCR", '"CAN0 MCR"'),
+    ("NOT", '"NOT"'),
+    ("clock AND (gate", '"clock" "AND" "gate"'),
+    ("?! -- ()", ""),
+    ("", ""),
+])
+def test_fts_query_quotes_each_word(query, expected):
+    assert MetadataStore._fts_query(query) == expected
+
+
+@pytest.mark.parametrize("query, chunk_id", [
+    ("what is FTM_SC?", "doc_ftm"),
+    ("CAN0-MCR", "doc_can"),
+    ("NOT", "doc_not"),
+])
+def test_keyword_search_matches_punctuation_and_operators_as_text(metadata_store, query, chunk_id):
+    assert [hit for hit, _ in metadata_store.keyword_search(query)] == [chunk_id]
+    assert [hit for hit, _ in metadata_store.keyword_search(query, doc_filter="doc")] == [chunk_id]
+
+
+@pytest.mark.parametrize("query", ["?!", "   "])
+def test_keyword_search_without_tokens_returns_nothing(metadata_store, query):
+    assert metadata_store.keyword_search(query) == []
@@ -0,0 +1,114 @@
+"""Tests for the shared ingestion pipeline."""
+
+import hashlib
+from pathlib import Path
+from typing import List
+
+import fitz
+import numpy as np
+import pytest
+
+from mcp_embedded_docs.indexing.metadata_store import MetadataStore
+from mcp_embedded_docs.indexing.vector_store import VectorStore
+from mcp_embedded_docs.ingestion.chunker import SemanticChunker
+from mcp_embedded_docs.ingestion.pipeline import (
+    document_id, index_chunks, parse_document, record_document,
+)
+
+
+class HashEmbedder:
+    """Deterministic stand-in for a sentence-transformers model."""
+
+    model_name = "test-model"
+    embedding_id = "test:test-model:fp32"
+    dimension = 16
+
+    def embed_batch(self, texts: List[str], show_progress: bool = False) -> np.ndarray:
+        seeds = [int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little") for text in texts]
+        vectors = np.array(
+            [np.random.default_rng(seed).normal(size=self.dimension) for seed in seeds], dtype=np.float32
+        )
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _write_pdf(path: Path, body: str):
+    """Write a small two-page PDF whose text mentions `body`."""
+    doc = fitz.open()
+    for page_num in range(2):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"{page_num + 1}.1 Clock Control", fontsize=14)
+        page.insert_text((72, 110), f"The {body} register configures page {page_num + 1}.", fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def _ingest(pdf_path: Path, vector_store: VectorStore, metadata_store: MetadataStore) -> str:
+    doc_id = document_id(pdf_path)
+    parsed = parse_document(pdf_path)
+    chunks = SemanticChunker().iter_chunks(
+        doc_id, parsed.sections, parsed.tables, doc_title=pdf_path.stem, table_pages=parsed.table_pages
+    )
+    index_chunks(chunks, HashEmbedder(), vector_store, metadata_store)
+    record_document(metadata_store, vector_store, doc_id, pdf_path)
+    return doc_id
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_reingesting_edited_file_replaces_previous_version(tmp_path, index_type):
+    pdf_path = tmp_path / "spec.pdf"
+    vector_store = VectorStore(dimension=HashEmbedder.dimension, index_type=index_type)
+
+    with MetadataStore(tmp_path / "metadata.db") as metadata_store:
+        _write_pdf(pdf_path, "OLDCLK")
+        old_id = _ingest(pdf_path, vector_store, metadata_store)
+
+        _write_pdf(pdf_path, "NEWCLK")
+        new_id = _ingest(pdf_path, vector_store, metadata_store)
+
+        assert new_id != old_id
+        assert [doc["id"] for doc in metadata_store.list_documents()] == [new_id]
+        assert metadata_store.get_document_stats(old_id)["chunks"] == 0
+        assert metadata_store.get_document_stats(new_id)["chunks"] > 0
+
+        assert metadata_store.keyword_search("OLDCLK") == []
+        hits = metadata_store.keyword_search("NEWCLK")
+        assert hits
+        assert all(metadata_store.get_chunk(chunk_id)["doc_id"] == new_id for chunk_id, _ in hits)
+
+        # The old version's vectors are gone too
+        assert len(vector_store) == len(vector_store.ids) == metadata_store.get_document_stats(new_id)["chunks"]
+        assert all(chunk_id.startswith(f"{new_id}_") for chunk_id in vector_store.ids.values())
+
+
+def test_same_filename_in_another_directory_is_a_separate_document(tmp_path):
+    first_path = tmp_path / "spec.pdf"
+    second_path = tmp_path / "other" / "spec.pdf"
+    second_path.parent.mkdir()
+    vector_store = VectorStore(dimension=HashEmbedder.dimension, index_type="flat")
+
+    with MetadataStore(tmp_path / "metadata.db") as metadata_store:
+        _write_pdf(first_path, "OLDCLK")
+        first_id = _ingest(first_path, vector_store, metadata_store)
+        _write_pdf(second_path, "NEWCLK")
+        second_id = _ingest(second_path, vector_store, metadata_store)
+
+        assert {doc["id"] for doc in metadata_store.list_documents()} == {first_id, second_id}
+        assert metadata_store.keyword_search("OLDCLK")
+        assert len(vector_store) == sum(
+            metadata_store.get_document_stats(doc_id)["chunks"] for doc_id in (first_id, second_id)
+        )
+
+
+def test_reingesting_replaces_name_derived_document_id(tmp_path):
+    pdf_path = tmp_path / "spec.pdf"
+    _write_pdf(pdf_path, "NEWCLK")
+    vector_store = VectorStore(dimension=HashEmbedder.dimension, index_type="flat")
+
+    with MetadataStore(tmp_path / "metadata.db") as metadata_store:
+        # Older indexes keyed documents by the MD5 of their filename
+        legacy_id = hashlib.md5(pdf_path.name.encode()).hexdigest()[:16]
+        metadata_store.add_document(legacy_id, pdf_path.name)
+
+        new_id = _ingest(pdf_path, vector_store, metadata_store)
+
+        assert [doc["id"] for doc in metadata_store.list_documents()] == [new_id]
@@ -0,0 +1,43 @@
+"""Tests for the FAISS vector store."""
+
+import pickle
+
+import faiss
+import numpy as np
+import pytest
+
+from mcp_embedded_docs.indexing.vector_store import VectorStore
+
+
+def _write_legacy_index(path, vectors, ids):
+    """Write an index in the original format: unlabeled flat index, list of IDs by position."""
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    faiss.write_index(index, str(path))
+    with open(path.with_suffix('.ids'), 'wb') as f:
+        pickle.dump(ids, f)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_load_migrates_legacy_id_list_once(tmp_path, index_type):
+    vectors = np.random.default_rng(0).normal(size=(20, 8)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    ids = [f"doc_{i}" for i in range(len(vectors))]
+    index_path = tmp_path / "vectors.faiss"
+    _write_legacy_index(index_path, vectors, ids)
+
+    store = VectorStore(dimension=8, index_type=index_type)
+    store.load(index_path)
+
+    assert len(store) == len(ids)
+    assert sorted(store.ids.values()) == sorted(ids)
+    assert store.search(vectors[3], top_k=1)[0][0] == "doc_3"
+
+    # The migrated index was written back, so the next load uses it as is
+    with open(index_path.with_suffix('.ids'), 'rb') as f:
+        assert isinstance(pickle.load(f), dict)
+
+    reloaded = VectorStore(dimension=8, index_type=index_type)
+    reloaded.load(index_path)
+    assert reloaded.ids == store.ids
+    assert reloaded.search(vectors[7], top_k=1)[0][0] == "doc_7"